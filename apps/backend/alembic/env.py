@@ -10,6 +10,7 @@ from app.base import Base
 from app.domains.study.models import InteractionLog, User, Topic, ChatSession, ChatMessage
 from app.domains.access.models import AccessCode
 from app.domains.subject.models import Subject
+from app.domains.jobs.models import GenerationJob
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
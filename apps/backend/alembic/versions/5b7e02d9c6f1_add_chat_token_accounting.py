@@ -0,0 +1,34 @@
+"""add_chat_token_accounting
+
+Revision ID: 5b7e02d9c6f1
+Revises: a3c91f27d5e4
+Create Date: 2026-10-18 11:40:07.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e02d9c6f1'
+down_revision: Union[str, Sequence[str], None] = 'a3c91f27d5e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_messages', sa.Column('token_count', sa.Integer(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_token_count', sa.Integer(), nullable=True))
+    # Backfill with the same ~4 chars/token estimate used by the app
+    op.execute("UPDATE chat_messages SET token_count = length(content) / 4 + 1")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chat_sessions') as batch_op:
+        batch_op.drop_column('summary_token_count')
+    with op.batch_alter_table('chat_messages') as batch_op:
+        batch_op.drop_column('token_count')
@@ -0,0 +1,28 @@
+"""add_topic_slug_unique_index
+
+Revision ID: 7e4b1a9d2c63
+Revises: d2c5a7e9f310
+Create Date: 2026-10-18 21:14:52.803116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4b1a9d2c63'
+down_revision: Union[str, Sequence[str], None] = 'd2c5a7e9f310'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('uq_topics_subject_id_slug', 'topics', ['subject_id', 'slug'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_topics_subject_id_slug', table_name='topics')
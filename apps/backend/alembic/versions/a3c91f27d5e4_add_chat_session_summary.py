@@ -0,0 +1,31 @@
+"""add_chat_session_summary
+
+Revision ID: a3c91f27d5e4
+Revises: 1006a444a0e2
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91f27d5e4'
+down_revision: Union[str, Sequence[str], None] = '1006a444a0e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chat_sessions', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('chat_sessions', sa.Column('summary_until_message_id', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('chat_sessions') as batch_op:
+        batch_op.drop_column('summary_until_message_id')
+        batch_op.drop_column('summary')
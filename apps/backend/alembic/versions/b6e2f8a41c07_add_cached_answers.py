@@ -0,0 +1,44 @@
+"""add_cached_answers
+
+Revision ID: b6e2f8a41c07
+Revises: f3a9c2d71e48
+Create Date: 2026-10-18 16:05:33.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f8a41c07'
+down_revision: Union[str, Sequence[str], None] = 'f3a9c2d71e48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GUID = sa.String().with_variant(postgresql.UUID(as_uuid=False), "postgresql")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cached_answers',
+    sa.Column('id', GUID, nullable=False),
+    sa.Column('topic_id', GUID, nullable=False),
+    sa.Column('language', sa.String(), nullable=False),
+    sa.Column('question_key', sa.String(), nullable=False),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=False),
+    sa.Column('embedding', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_cached_answers_topic_id_language_question_key', 'cached_answers', ['topic_id', 'language', 'question_key'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_cached_answers_topic_id_language_question_key', table_name='cached_answers')
+    op.drop_table('cached_answers')
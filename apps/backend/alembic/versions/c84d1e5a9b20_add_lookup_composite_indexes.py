@@ -0,0 +1,43 @@
+"""add_lookup_composite_indexes
+
+Revision ID: c84d1e5a9b20
+Revises: 5b7e02d9c6f1
+Create Date: 2026-10-18 13:05:52.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c84d1e5a9b20'
+down_revision: Union[str, Sequence[str], None] = '5b7e02d9c6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Drop duplicate translations (keep the oldest per topic/language) before enforcing uniqueness
+    op.execute("""
+        DELETE FROM topic_translations
+        WHERE id <> (
+            SELECT t2.id FROM topic_translations t2
+            WHERE t2.topic_id = topic_translations.topic_id
+              AND t2.language = topic_translations.language
+            ORDER BY t2.created_at, t2.id
+            LIMIT 1
+        )
+    """)
+    op.create_index('uq_topic_translations_topic_id_language', 'topic_translations', ['topic_id', 'language'], unique=True)
+    op.create_index('ix_chat_messages_session_id_created_at', 'chat_messages', ['session_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_sessions_user_id_topic_id_created_at', 'chat_sessions', ['user_id', 'topic_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chat_sessions_user_id_topic_id_created_at', table_name='chat_sessions')
+    op.drop_index('ix_chat_messages_session_id_created_at', table_name='chat_messages')
+    op.drop_index('uq_topic_translations_topic_id_language', table_name='topic_translations')
@@ -0,0 +1,55 @@
+"""add_generation_jobs
+
+Revision ID: d2c5a7e9f310
+Revises: b6e2f8a41c07
+Create Date: 2026-10-18 18:42:10.270551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2c5a7e9f310'
+down_revision: Union[str, Sequence[str], None] = 'b6e2f8a41c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GUID = sa.String().with_variant(postgresql.UUID(as_uuid=False), "postgresql")
+ACTIVE = sa.text("status IN ('queued', 'running')")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('generation_jobs',
+    sa.Column('id', GUID, nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('topic_id', GUID, nullable=False),
+    sa.Column('language', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('lease_owner', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('progress', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['topic_id'], ['topics.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_generation_jobs_active_topic_id_language', 'generation_jobs', ['topic_id', 'language'], unique=True, sqlite_where=ACTIVE, postgresql_where=ACTIVE)
+    op.create_index('ix_generation_jobs_status_priority_created_at', 'generation_jobs', ['status', 'priority', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_generation_jobs_status_priority_created_at', table_name='generation_jobs')
+    op.drop_index('uq_generation_jobs_active_topic_id_language', table_name='generation_jobs')
+    op.drop_table('generation_jobs')
@@ -0,0 +1,65 @@
+"""use_native_uuid_on_postgres
+
+Revision ID: e1b7d3f05a62
+Revises: c84d1e5a9b20
+Create Date: 2026-10-18 14:21:07.318442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d3f05a62'
+down_revision: Union[str, Sequence[str], None] = 'c84d1e5a9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs holding UUIDs; referenced keys come before the columns pointing at them
+UUID_COLUMNS = [
+    ("users", "id"),
+    ("subjects", "id"),
+    ("topics", "id"),
+    ("topics", "subject_id"),
+    ("topics", "created_by_user_id"),
+    ("topic_translations", "id"),
+    ("topic_translations", "topic_id"),
+    ("chat_sessions", "id"),
+    ("chat_sessions", "topic_id"),
+    ("chat_sessions", "user_id"),
+    ("chat_sessions", "summary_until_message_id"),
+    ("chat_messages", "id"),
+    ("chat_messages", "session_id"),
+]
+
+
+def _convert(to_type: str, cast: str) -> None:
+    # Only Postgres has a native uuid type; other dialects keep storing strings
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    # Foreign keys must be dropped while both sides change type
+    inspector = sa.inspect(bind)
+    tables = sorted({table for table, _ in UUID_COLUMNS})
+    foreign_keys = [(table, fk) for table in tables for fk in inspector.get_foreign_keys(table)]
+    for table, fk in foreign_keys:
+        op.drop_constraint(fk["name"], table, type_="foreignkey")
+
+    for table, column in UUID_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {to_type} USING {column}::{cast}')
+
+    for table, fk in foreign_keys:
+        op.create_foreign_key(fk["name"], table, fk["referred_table"], fk["constrained_columns"], fk["referred_columns"])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _convert("UUID", "uuid")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert("VARCHAR", "text")
@@ -0,0 +1,28 @@
+"""add_topic_listing_index
+
+Revision ID: f3a9c2d71e48
+Revises: e1b7d3f05a62
+Create Date: 2026-10-18 15:02:44.581930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c2d71e48'
+down_revision: Union[str, Sequence[str], None] = 'e1b7d3f05a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_topics_subject_id_is_public_title_id', 'topics', ['subject_id', 'is_public', 'title', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_topics_subject_id_is_public_title_id', table_name='topics')
@@ -1,3 +1,8 @@
+from sqlalchemy import String
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
+
+# UUID keys: native uuid on Postgres, plain strings elsewhere (values are str either way)
+GUID = String().with_variant(UUID(as_uuid=False), "postgresql")
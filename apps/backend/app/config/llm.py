@@ -1,27 +1,284 @@
 from __future__ import annotations
 
+import asyncio
 import dspy
+import heapq
+import httpx
+import itertools
 import logging
 import litellm
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ..settings import Settings
 
 logger = logging.getLogger("dspy")
 
+_llm_executor: Optional[ThreadPoolExecutor] = None
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """
+    Bounded worker pool for blocking dspy/litellm calls.
+    Keeps LLM round-trips off the event loop without exhausting the default executor.
+    """
+    global _llm_executor
+    if _llm_executor is None:
+        from ..settings import get_settings
+        settings = get_settings()
+        _llm_executor = ThreadPoolExecutor(
+            max_workers=settings.llm_max_workers,
+            thread_name_prefix="llm-worker",
+        )
+    return _llm_executor
+
+def shutdown_llm_executor() -> None:
+    global _llm_executor
+    if _llm_executor is not None:
+        _llm_executor.shutdown(wait=False, cancel_futures=True)
+        _llm_executor = None
+
+async def run_llm(func: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Run a blocking LLM call on the worker pool and await it with a timeout.
+    Raises asyncio.TimeoutError if the call does not finish in time (the worker thread
+    is left to finish in the background, its result is discarded; an LLMSlot.bind call keeps its slot until then).
+    """
+    if timeout is None:
+        from ..settings import get_settings
+        timeout = get_settings().llm_request_timeout
+
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(get_llm_executor(), partial(func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout=timeout)
+
+# LLM call priorities (lower is served first)
+CHAT = 0        # A student waiting on an answer
+GENERATION = 1  # A topic explanation someone asked for
+BACKGROUND = 2  # Translation pre-generation, history compaction
+
+class LLMOverloaded(Exception):
+    """
+    An LM backend has too many calls waiting; mapped to 503 with Retry-After.
+    """
+    def __init__(self, backend: str, retry_after: int):
+        super().__init__(f"LLM backend '{backend}' is overloaded, retry in {retry_after}s")
+        self.backend = backend
+        self.retry_after = retry_after
+
+def backend_name(lm: Optional[dspy.LM]) -> str:
+    # Locales sharing an endpoint share its limit
+    if lm is None:
+        return "default"
+    return lm.kwargs.get("api_base") or lm.model
+
+class BackendLimiter:
+    """
+    Concurrency gate for one LM backend: at most `limit` calls in flight, the rest wait
+    lowest priority value first (FIFO within a priority). A call is rejected instead of
+    queued when LLM_MAX_QUEUE calls would be served before it, or after LLM_QUEUE_TIMEOUT.
+    Slots are per process; size LLM_MAX_CONCURRENCY x processes to the backend's capacity.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.max_wait_ms = 0.0
+
+    @property
+    def limit(self) -> int:
+        from ..settings import get_settings
+        settings = get_settings()
+        for entry in settings.llm_backend_limits.split(","):
+            name, _, value = entry.strip().rpartition("=")
+            if name == self.name:
+                return max(1, int(value))
+        return max(1, settings.llm_max_concurrency)
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        # Waiters served before a new call at `priority` (all of them when None)
+        return sum(1 for p, _, future in self._waiters if not future.done() and (priority is None or p <= priority))
+
+    def check(self, priority: int = CHAT) -> None:
+        """
+        Raise LLMOverloaded if a call at `priority` would be rejected right now.
+        """
+        from ..settings import get_settings
+        settings = get_settings()
+        if self.in_flight >= self.limit and self.queued(priority) >= settings.llm_max_queue:
+            self.rejected += 1
+            raise LLMOverloaded(self.name, settings.llm_retry_after_seconds)
+
+    async def acquire(self, priority: int = CHAT) -> None:
+        from ..settings import get_settings
+        settings = get_settings()
+        self._wake() # Picks up a raised limit
+        if self.in_flight < self.limit and not self.queued():
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        self.check(priority)
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=settings.llm_queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self.release() # Granted as we gave up: pass the slot on
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise LLMOverloaded(self.name, settings.llm_retry_after_seconds) from None
+            raise
+        self.admitted += 1
+        self.max_wait_ms = max(self.max_wait_ms, (time.monotonic() - started) * 1000)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        # Hand free slots straight to the next waiters
+        while self._waiters and self.in_flight < self.limit:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    def stats(self) -> dict:
+        by_priority: Dict[int, int] = {}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                by_priority[priority] = by_priority.get(priority, 0) + 1
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": sum(by_priority.values()),
+            "queued_by_priority": by_priority,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "max_wait_ms": round(self.max_wait_ms, 1),
+        }
+
+_limiters: Dict[str, BackendLimiter] = {}
+
+def get_limiter(lm: Optional[dspy.LM] = None) -> BackendLimiter:
+    """
+    The limiter of `lm`'s backend (the default dspy LM when None).
+    """
+    name = backend_name(lm or dspy.settings.lm)
+    limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = _limiters[name] = BackendLimiter(name)
+    return limiter
+
+class LLMSlot:
+    """
+    One call slot taken from a BackendLimiter, for one call. Released when the llm_slot() block
+    exits, unless a worker thread has started the call (bind): then it is released when that
+    thread finishes. A call abandoned on timeout keeps running in its thread, and keeps counting
+    against the backend's limit until the backend has answered.
+    """
+    def __init__(self, limiter: BackendLimiter):
+        self._limiter = limiter
+        self._loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        self._state = "held" # -> "running" (in a worker thread) -> "released"
+
+    def bind(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        `func` wrapped to hold the slot while it runs in a worker thread. It does not run
+        if the block has already exited (the caller gave up before a thread picked it up).
+        """
+        def run(*args, **kwargs):
+            with self._lock:
+                if self._state != "held":
+                    raise RuntimeError("LLM call abandoned before it started")
+                self._state = "running"
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._release_from_thread()
+        return run
+
+    def bind_program(self, program: dspy.Module) -> dspy.Module:
+        # A Module, so dspy.streamify's listeners still find the program's predictors
+        return SlotBoundProgram(program, self.bind(program))
+
+    def _release_from_thread(self) -> None:
+        with self._lock:
+            self._state = "released"
+        try:
+            self._loop.call_soon_threadsafe(self._limiter.release)
+        except RuntimeError:
+            pass # Event loop already closed (shutdown)
+
+    def exit(self) -> None:
+        # End of the llm_slot() block: a call running in a worker thread releases the slot itself
+        with self._lock:
+            if self._state != "held":
+                return
+            self._state = "released"
+        self._limiter.release()
+
+class SlotBoundProgram(dspy.Module):
+    """
+    A dspy program that runs under an LLMSlot (see LLMSlot.bind_program).
+    """
+    def __init__(self, program: dspy.Module, call: Callable[..., Any]):
+        super().__init__()
+        self.program = program
+        self._call = call
+
+    def forward(self, **kwargs):
+        return self._call(**kwargs)
+
+@asynccontextmanager
+async def llm_slot(lm: Optional[dspy.LM] = None, priority: int = CHAT):
+    """
+    Take one of the backend's call slots for the block. Run the call through the yielded
+    LLMSlot (run_llm(slot.bind(func)), slot.bind_program(program)) so that the slot is held
+    until the call has really finished, not just until the block gives up on it.
+    """
+    limiter = get_limiter(lm)
+    await limiter.acquire(priority)
+    slot = LLMSlot(limiter)
+    try:
+        yield slot
+    finally:
+        slot.exit()
+
+def llm_limiter_stats() -> Dict[str, dict]:
+    return {name: limiter.stats() for name, limiter in _limiters.items()}
+
 def configure_llm(settings: Settings) -> None:
     litellm.drop_params = True
+
+    # One pooled HTTP client for every litellm call instead of a connection per request
+    if litellm.client_session is None:
+        litellm.client_session = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_workers,
+                max_keepalive_connections=settings.llm_max_workers,
+            ),
+            timeout=settings.llm_request_timeout,
+        )
     
     # Prefer N-Atlas as default if available
     if settings.n_atlas_api_base:
         logger.info("Configuring N-Atlas as default LM")
-        lm = dspy.LM(
-            model=settings.n_atlas_model_id if hasattr(settings, 'n_atlas_model_id') else "openai/n-atlas",
-            api_base=settings.n_atlas_api_base,
-            api_key="EMPTY",
-            max_tokens=4096,
-            temperature=0.7,
-        )
+        lm = _build_n_atlas_lm(settings)
     else:
         logger.info("Configuring Bedrock as default LM")
         model_id = settings.strands_model_id
@@ -33,7 +290,18 @@ def configure_llm(settings: Settings) -> None:
             temperature=settings.strands_default_temperature,
         )
     
-    dspy.settings.configure(lm=lm)
+    # dspy.streamify runs programs on its own thread limiter (8 by default); size it like the worker pool
+    dspy.settings.configure(lm=lm, async_max_workers=settings.llm_max_workers)
+    build_lm_registry(settings)
+
+def _build_n_atlas_lm(settings: Settings) -> dspy.LM:
+    return dspy.LM(
+        model=settings.n_atlas_model_id,
+        api_base=settings.n_atlas_api_base,
+        api_key="EMPTY",
+        max_tokens=4096,
+        temperature=0.7,
+    )
 
 def get_n_atlas_lm() -> Optional[dspy.LM]:
     from ..settings import get_settings
@@ -43,14 +311,7 @@ def get_n_atlas_lm() -> Optional[dspy.LM]:
         return None
         
     try:
-        lm = dspy.LM(
-            model=settings.n_atlas_model_id,
-            api_base=settings.n_atlas_api_base,
-            api_key="EMPTY",
-            max_tokens=4096,
-            temperature=0.7,
-        )
-        return lm
+        return _build_n_atlas_lm(settings)
     except Exception as e:
         logger.error(f"Failed to instantiate N-Atlas LM: {e}")
         return None
@@ -70,9 +331,52 @@ def get_openrouter_judge_lm() -> Optional[dspy.LM]:
         temperature=0.1,
     )
 
-def get_lm_for_locale(language: str) -> Optional[dspy.LM]:
-    target_languages = ["english", "yoruba", "hausa", "igbo", "pidgin", "broken english"]
+# Locale -> LM registry, built once (at startup or on first use) and shared by all requests
+LOCALE_LANGUAGES = ["english", "yoruba", "hausa", "igbo", "pidgin", "broken english"]
+
+_lm_registry: Dict[str, dspy.LM] = {}
+_lm_registry_key: Optional[Tuple] = None
+_lm_registry_lock = threading.Lock()
 
-    if language.lower() in target_languages:
-        return get_n_atlas_lm()
-    return None
+def _lm_settings_key(settings: Settings) -> Tuple:
+    return (settings.n_atlas_api_base, settings.n_atlas_model_id)
+
+def build_lm_registry(settings: Settings) -> None:
+    """
+    Build the per-locale LMs. All supported locales currently share a single N-Atlas
+    client, so its litellm connections and dspy cache are reused across requests.
+    """
+    global _lm_registry, _lm_registry_key
+    with _lm_registry_lock:
+        registry: Dict[str, dspy.LM] = {}
+        if settings.n_atlas_api_base:
+            try:
+                lm = _build_n_atlas_lm(settings)
+                registry = {language: lm for language in LOCALE_LANGUAGES}
+            except Exception as e:
+                logger.error(f"Failed to instantiate N-Atlas LM: {e}")
+        # Swap atomically so readers never see a half-built registry
+        _lm_registry = registry
+        _lm_registry_key = _lm_settings_key(settings)
+
+def reload_lm_registry(settings: Optional[Settings] = None) -> bool:
+    """
+    Rebuild the registry if the LM settings changed. Returns True when it was rebuilt.
+    """
+    if settings is None:
+        from ..settings import get_settings
+        settings = get_settings()
+
+    if _lm_settings_key(settings) == _lm_registry_key:
+        return False
+
+    logger.info("LM settings changed, rebuilding LM registry")
+    build_lm_registry(settings)
+    return True
+
+def get_lm_for_locale(language: str) -> Optional[dspy.LM]:
+    if _lm_registry_key is None:
+        # Scripts and workers that skip the app lifespan build it lazily
+        from ..settings import get_settings
+        build_lm_registry(get_settings())
+    return _lm_registry.get(language.lower())
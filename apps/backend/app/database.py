@@ -1,23 +1,128 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from fastapi import Depends
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from app.settings import get_settings
 
+# The engines are built once at import: their settings need a restart, not a SIGHUP reload
 settings = get_settings()
 
-# SQLite database URL
+# Database URL (SQLite by default, Postgres in production)
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-# Create engine
+# Optional read replica for hot read paths (falls back to the primary)
+SQLALCHEMY_READ_REPLICA_URL = settings.database_read_replica_url
+
+# Async drivers for the request path (aiosqlite for dev, asyncpg for Postgres)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL onto its async driver, e.g. sqlite:// -> sqlite+aiosqlite://.
+    URLs that already name a driver are returned unchanged.
+    """
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return url
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def is_sqlite_memory(url: str) -> bool:
+    return is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+def sqlite_pragmas(settings) -> dict:
+    """
+    Per-connection PRAGMAs for the configured SQLite profile.
+    WAL lets readers run alongside the single writer; busy_timeout makes a
+    writer wait for the lock instead of failing with "database is locked".
+    """
+    pragmas = {"busy_timeout": settings.sqlite_busy_timeout_ms}
+    if settings.sqlite_profile == "production":
+        pragmas.update({
+            "journal_mode": "WAL",
+            "synchronous": settings.sqlite_synchronous,
+            "cache_size": -settings.sqlite_cache_size_kib,  # negative = KiB rather than pages
+            "mmap_size": settings.sqlite_mmap_size,
+            "temp_store": "MEMORY",
+        })
+    return pragmas
+
+def apply_sqlite_pragmas(engine, pragmas: dict) -> None:
+    """
+    Run the PRAGMAs on every new DBAPI connection of a (sync) engine.
+    """
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def engine_options(url: str, settings, is_async: bool = False) -> dict:
+    """
+    Pool sizing and driver options shared by the sync and async engines.
+    """
+    if is_sqlite(url):
+        options = {} if is_async else {"connect_args": {"check_same_thread": False}}
+        if not is_sqlite_memory(url):
+            options.update(pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+        return options
+
+    # Postgres: QueuePool with liveness checks, recycling and a server-side statement timeout
+    timeout_ms = str(settings.db_statement_timeout_ms)
+    connect_args = (
+        {"server_settings": {"statement_timeout": timeout_ms}}  # asyncpg
+        if is_async else
+        {"options": f"-c statement_timeout={timeout_ms}"}  # psycopg2
+    )
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+    }
+
+# Create engine (scripts, migrations and other synchronous tooling)
 # check_same_thread=False is needed for SQLite in multithreaded (FastAPI) envs
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL, settings))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers, so DB waits don't block the event loop
+async_engine = create_async_engine(
+    to_async_url(SQLALCHEMY_DATABASE_URL),
+    **engine_options(SQLALCHEMY_DATABASE_URL, settings, is_async=True),
+)
+
+# Replica engine (read-only queries that tolerate replication lag)
+read_async_engine = create_async_engine(
+    to_async_url(SQLALCHEMY_READ_REPLICA_URL),
+    **engine_options(SQLALCHEMY_READ_REPLICA_URL, settings, is_async=True),
+) if SQLALCHEMY_READ_REPLICA_URL else None
+
+if is_sqlite(SQLALCHEMY_DATABASE_URL):
+    apply_sqlite_pragmas(engine, sqlite_pragmas(settings))
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas(settings))
+if read_async_engine is not None and is_sqlite(SQLALCHEMY_READ_REPLICA_URL):
+    apply_sqlite_pragmas(read_async_engine.sync_engine, sqlite_pragmas(settings))
+
+# expire_on_commit=False: attributes stay loaded after commit (no implicit async lazy-loads)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(read_async_engine, autoflush=False, expire_on_commit=False) if read_async_engine else None
+
 def get_db() -> Generator[Session, None, None]:
     """
     Dependency to get DB session.
@@ -28,3 +133,27 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async DB session.
+    Yields session and closes it after request.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db(db: AsyncSession = Depends(get_async_db)) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get a session for replica-safe reads.
+    Without a replica configured this is the request's primary session.
+    """
+    if AsyncReadSessionLocal is None:
+        yield db
+        return
+    async with AsyncReadSessionLocal() as read_db:
+        yield read_db
+
+async def dispose_engines() -> None:
+    await async_engine.dispose()
+    if read_async_engine is not None:
+        await read_async_engine.dispose()
@@ -0,0 +1,95 @@
+import asyncio
+import time
+from typing import FrozenSet, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.domains.access.repository import AccessRepository, normalize_access_code
+from app.settings import Settings, get_settings, on_settings_reload
+from app.utils.cache import TTLCache, shared_cache
+from app.utils.security import hash_access_code
+
+# Bumped by scripts/manage_access.py; with REDIS_URL every server sees it on its next poll
+VERSION_KEY = "access_codes:version"
+version_store = shared_cache(get_settings().redis_url, maxsize=1, ttl=get_settings().access_code_refresh_seconds)
+
+class ActiveAccessCodes:
+    """
+    In-memory set of active access-code hashes: lookups are a set membership test.
+    Codes not in the set are checked against the DB once (the set may be behind a code
+    added by another process) and then remembered as invalid for a while.
+    """
+    def __init__(self, negative_ttl: float, negative_maxsize: int = 10000):
+        self._hashes: Optional[FrozenSet[str]] = None
+        self._version = 0
+        self.loaded_at = 0.0
+        self.invalid = TTLCache(maxsize=negative_maxsize, ttl=negative_ttl, name="access_code_misses")
+        self._lock = asyncio.Lock()
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """
+        Reload the active hashes from the DB. Returns the number of active codes.
+        """
+        hashes = await AccessRepository.list_active_hashes(db)
+        # Swap in one assignment; readers never see a half-built set
+        self._hashes = hashes
+        self.loaded_at = time.monotonic()
+        self.invalid.clear()
+        return len(hashes)
+
+    async def is_active(self, db: AsyncSession, code: str) -> bool:
+        if self._hashes is None:
+            async with self._lock:
+                if self._hashes is None:
+                    await self.refresh(db)
+
+        hashed_code = hash_access_code(normalize_access_code(code))
+        if hashed_code in self._hashes:
+            return True
+        if self.invalid.get(hashed_code):
+            return False
+
+        if await AccessRepository.get_active_by_hash(db, hashed_code):
+            self._hashes = self._hashes | {hashed_code}
+            return True
+        self.invalid.set(hashed_code, True)
+        return False
+
+    async def poll(self) -> None:
+        """
+        Reload when manage_access.py signals a change, or every ACCESS_CODE_REFRESH_SECONDS.
+        """
+        while True:
+            settings = get_settings()
+            await asyncio.sleep(settings.access_code_poll_seconds)
+            try:
+                version = await version_store.get_counter(VERSION_KEY)
+                stale = time.monotonic() - self.loaded_at >= settings.access_code_refresh_seconds
+                if version != self._version or stale:
+                    async with AsyncSessionLocal() as db:
+                        await self.refresh(db)
+                    self._version = version
+            except Exception as e:
+                print(f"Access code refresh failed: {e}")
+
+active_access_codes = ActiveAccessCodes(negative_ttl=get_settings().access_code_negative_ttl_seconds)
+
+@on_settings_reload
+def _configure_access_code_misses(settings: Settings) -> None:
+    active_access_codes.invalid.configure(active_access_codes.invalid.maxsize, settings.access_code_negative_ttl_seconds)
+
+async def load_access_codes() -> None:
+    """
+    Startup: fill the set before the first request.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            count = await active_access_codes.refresh(db)
+        print(f"Loaded {count} active access codes")
+    except Exception as e:
+        # e.g. migrations not applied yet; the first lookup retries
+        print(f"Could not load access codes: {e}")
+
+async def notify_access_codes_changed() -> None:
+    await version_store.incr(VERSION_KEY)
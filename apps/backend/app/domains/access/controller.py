@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.domains.access.schemas import VerifyAccessRequest, VerifyAccessResponse
-from app.domains.access.repository import AccessRepository
+from app.domains.access.cache import active_access_codes
 from app.domains.study.repository import UserRepository
 from app.domains.auth import get_current_user
 from app.domains.study.models import User
@@ -11,7 +11,7 @@ from app.settings import get_settings
 router = APIRouter(prefix="/access", tags=["Access"])
 
 @router.post("/verify", response_model=VerifyAccessResponse)
-async def verify_code(payload: VerifyAccessRequest, db: Session = Depends(get_db)):
+async def verify_code(payload: VerifyAccessRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Check if a code is valid (Stateless check).
     """
@@ -19,8 +19,7 @@ async def verify_code(payload: VerifyAccessRequest, db: Session = Depends(get_db
     if not settings.enable_access_control:
         return VerifyAccessResponse(valid=True)
     
-    code_entry = AccessRepository.get_active_code(db, payload.code)
-    if not code_entry:
+    if not await active_access_codes.is_active(db, payload.code):
         raise HTTPException(status_code=401, detail="Invalid access code")
         
     return VerifyAccessResponse(valid=True)
@@ -29,7 +28,7 @@ async def verify_code(payload: VerifyAccessRequest, db: Session = Depends(get_db
 async def activate_access(
     payload: VerifyAccessRequest, 
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Activate the current user's account with an access code.
@@ -38,13 +37,12 @@ async def activate_access(
     if not settings.enable_access_control:
         return VerifyAccessResponse(valid=True)
         
-    code_entry = AccessRepository.get_active_code(db, payload.code)
-    if not code_entry:
+    if not await active_access_codes.is_active(db, payload.code):
         raise HTTPException(status_code=401, detail="Invalid access code")
     
     try:
         user_repo = UserRepository(db)
-        user_repo.verify_access(user)
+        await user_repo.verify_access(user)
     except Exception as e:
          raise HTTPException(status_code=500, detail=f"Failed to activate user: {e}")
     
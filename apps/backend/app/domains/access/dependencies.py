@@ -1,12 +1,12 @@
 from fastapi import Header, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.settings import get_settings
-from app.domains.access.repository import AccessRepository
+from app.domains.access.cache import active_access_codes
 
-def verify_access_code(
+async def verify_access_code(
     x_access_code: str = Header(None, alias="x-access-code"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Dependency to verify x-access-code header.
@@ -20,8 +20,7 @@ def verify_access_code(
     if not x_access_code:
         raise HTTPException(status_code=401, detail="Access code required")
 
-    code_entry = AccessRepository.get_active_code(db, x_access_code)
-    if not code_entry:
+    if not await active_access_codes.is_active(db, x_access_code):
         raise HTTPException(status_code=401, detail="Invalid access code")
         
     return True
@@ -1,14 +1,26 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import FrozenSet
 from app.domains.access.models import AccessCode
 from app.utils.security import hash_access_code
 
+def normalize_access_code(code: str) -> str:
+    # Normalize: trim and uppercase to handle user input variations
+    return code.strip().upper()
+
 class AccessRepository:
     @staticmethod
-    def get_active_code(db: Session, code: str) -> AccessCode:
-        # Normalize: trim and uppercase to handle user input variations
-        normalized_code = code.strip().upper()
-        hashed_code = hash_access_code(normalized_code)
-        return db.query(AccessCode).filter(
+    async def get_active_code(db: AsyncSession, code: str) -> AccessCode:
+        hashed_code = hash_access_code(normalize_access_code(code))
+        return await AccessRepository.get_active_by_hash(db, hashed_code)
+
+    @staticmethod
+    async def get_active_by_hash(db: AsyncSession, hashed_code: str) -> AccessCode:
+        return await db.scalar(select(AccessCode).where(
             AccessCode.code == hashed_code,
             AccessCode.is_active == True
-        ).first()
+        ))
+
+    @staticmethod
+    async def list_active_hashes(db: AsyncSession) -> FrozenSet[str]:
+        return frozenset(await db.scalars(select(AccessCode.code).where(AccessCode.is_active == True)))
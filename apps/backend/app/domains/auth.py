@@ -1,49 +1,100 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import firebase_admin
-from firebase_admin import auth, credentials
-from sqlalchemy.orm import Session
-from app.database import get_db
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.domains.study.repository import UserRepository
 from app.domains.study.models import User
-from app.settings import get_settings
+from app.settings import Settings, get_settings, on_settings_reload
+from app.utils.cache import TTLCache
+import hashlib
+import hmac
 import os
 import json
+import threading
+import time
 
 security = HTTPBearer()
-settings = get_settings()
+
+# Decoded ID tokens keyed by sha256(token): repeat requests skip signature verification
+verified_token_cache = TTLCache(
+    maxsize=get_settings().auth_token_cache_max_entries,
+    ttl=get_settings().auth_token_cache_ttl_seconds,
+    name="auth_tokens",
+)
+
+# Verified users keyed by Firebase uid: repeat requests skip the users-table lookup
+user_cache = TTLCache(
+    maxsize=get_settings().auth_token_cache_max_entries,
+    ttl=get_settings().auth_user_cache_ttl_seconds,
+    name="auth_users",
+)
+
+@on_settings_reload
+def _configure_auth_caches(settings: Settings) -> None:
+    verified_token_cache.configure(settings.auth_token_cache_max_entries, settings.auth_token_cache_ttl_seconds)
+    user_cache.configure(settings.auth_token_cache_max_entries, settings.auth_user_cache_ttl_seconds)
+
+# Stop serving a cached token this many seconds before it expires
+TOKEN_EXPIRY_LEEWAY_SECONDS = 30
+
+_firebase_lock = threading.Lock()
 
 def get_firebase_app():
-    try:
-        if not firebase_admin._apps:
-            # 1. Check for file path first (User preference)
-            if settings.firebase_credentials_path and os.path.exists(settings.firebase_credentials_path):
-                 cred = credentials.Certificate(settings.firebase_credentials_path)
-                 firebase_admin.initialize_app(cred)
-            # 2. Check for raw JSON content
-            elif settings.firebase_service_account_json:
-                cred = credentials.Certificate(json.loads(settings.firebase_service_account_json))
-                firebase_admin.initialize_app(cred)
-            else:
-                 # 3. Fallback to default google credentials search
-                firebase_admin.initialize_app()
-        return firebase_admin.get_app()
-    except ValueError:
-        # App already exists
-        return firebase_admin.get_app()
+    """
+    Firebase app, initialized on first use. firebase_admin (and google-auth) are imported
+    here rather than at module load, so importing the app and scripts stays cheap.
+    Blocking (may read credential files): call it off the event loop.
+    """
+    import firebase_admin
+    from firebase_admin import credentials
+
+    settings = get_settings()
+    with _firebase_lock:
+        try:
+            if not firebase_admin._apps:
+                # 1. Check for file path first (User preference)
+                if settings.firebase_credentials_path and os.path.exists(settings.firebase_credentials_path):
+                     cred = credentials.Certificate(settings.firebase_credentials_path)
+                     firebase_admin.initialize_app(cred)
+                # 2. Check for raw JSON content
+                elif settings.firebase_service_account_json:
+                    cred = credentials.Certificate(json.loads(settings.firebase_service_account_json))
+                    firebase_admin.initialize_app(cred)
+                else:
+                     # 3. Fallback to default google credentials search
+                    firebase_admin.initialize_app()
+            return firebase_admin.get_app()
+        except ValueError:
+            # App already exists
+            return firebase_admin.get_app()
 
-# Initialize on module load if possible, or lazy load in dependency
-# Lazy loading is safer for tests/environments without creds immediately available
-get_firebase_app()
+def verify_id_token(token: str) -> dict:
+    from firebase_admin import auth
+    return auth.verify_id_token(token, app=get_firebase_app())
 
-def get_current_user(
+async def verify_token(token: str) -> dict:
+    """
+    Decoded Firebase ID token, cached until shortly before its `exp`.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    decoded_token = verified_token_cache.get(key)
+    if decoded_token is None:
+        # Signature checks (and periodic cert fetches) are blocking; keep them off the event loop
+        decoded_token = await run_in_threadpool(verify_id_token, token)
+        ttl = decoded_token.get("exp", 0) - time.time() - TOKEN_EXPIRY_LEEWAY_SECONDS
+        if ttl > 0:
+            verified_token_cache.set(key, decoded_token, ttl=min(ttl, verified_token_cache.ttl))
+    return decoded_token
+
+async def get_current_user(
     cred: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     token = cred.credentials
     try:
         # Verify the ID token
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await verify_token(token)
         uid = decoded_token['uid']
         email = decoded_token.get('email', '')
     except Exception as e:
@@ -52,14 +103,22 @@ def get_current_user(
             detail=f"Invalid authentication credentials: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Cached users are detached instances shared across requests: read them, don't mutate them
+    user = user_cache.get(uid)
+    if user:
+        return user
     
     user_repo = UserRepository(db)
-    user = user_repo.get_by_firebase_uid(uid)
+    user = await user_repo.get_by_firebase_uid(uid)
     
     if not user:
         # On-the-fly user creation
-        user = user_repo.create(email=email, firebase_uid=uid)
-        
+        user = await user_repo.create(email=email, firebase_uid=uid)
+
+    # Verification is one-way, so only verified users are cached (a pending activation is never served stale)
+    if user.is_verified:
+        user_cache.set(uid, user)
     return user
 
 def get_current_verified_user(
@@ -78,3 +137,13 @@ def get_current_verified_user(
             detail="Access code verification required. Please activate your account."
         )
     return user
+
+def verify_metrics_token(x_metrics_token: str = Header(None, alias="x-metrics-token")) -> None:
+    """
+    Guards the /metrics endpoints (internal queue and cache state) with METRICS_TOKEN.
+    """
+    expected = get_settings().metrics_token
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token, expected):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
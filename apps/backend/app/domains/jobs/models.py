@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
+from sqlalchemy.sql import func
+from app.base import Base, GUID
+import uuid
+from datetime import datetime, timezone
+
+# Job lifecycle: queued -> running -> done, or back to queued (retry with backoff) until failed
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class GenerationJob(Base):
+    """
+    Durable LLM generation job. Workers lease a job (lease_owner/lease_expires_at) and
+    renew the lease while it runs; a job whose worker died is leased again once it expires.
+    """
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        # At most one active job per topic/language: enqueueing again attaches to it
+        Index(
+            "uq_generation_jobs_active_topic_id_language", "topic_id", "language", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        # Lease queries: next runnable job by priority, then age
+        Index("ix_generation_jobs_status_priority_created_at", "status", "priority", "created_at"),
+    )
+
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=False)
+    language = Column(String, nullable=False)
+    payload = Column(Text, nullable=True) # JSON handler arguments
+    priority = Column(Integer, nullable=False, default=0) # Lower runs first
+
+    status = Column(String, nullable=False, default=QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)) # Retry backoff
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    progress = Column(Text, nullable=True) # Output so far, for clients attaching to a running job
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
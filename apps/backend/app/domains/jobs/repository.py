@@ -0,0 +1,175 @@
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.domains.jobs.models import GenerationJob, QUEUED, RUNNING, DONE, FAILED
+from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
+import json
+import uuid
+
+ACTIVE = (QUEUED, RUNNING)
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class JobRepository:
+    """
+    Updates below use synchronize_session=False: jobs are always re-read with
+    populate_existing, and SQLite returns naive datetimes that can't be evaluated in Python.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, kind: str, topic_id: str, language: str, payload: Optional[dict] = None, priority: int = 0, max_attempts: int = 3) -> GenerationJob:
+        """
+        Queue a job, or return the active one for the same topic/language
+        (moved up to `priority` if it is still waiting at a lower one).
+        """
+        existing = await self.get_active(topic_id, language)
+        if existing:
+            if existing.status == QUEUED and existing.priority > priority:
+                existing.priority = priority
+                await self.db.commit()
+            return existing
+
+        now = utcnow()
+        job = GenerationJob(
+            id=str(uuid.uuid4()), kind=kind, topic_id=topic_id, language=language,
+            payload=json.dumps(payload) if payload else None, priority=priority,
+            status=QUEUED, attempts=0, max_attempts=max_attempts, run_after=now,
+            created_at=now, updated_at=now
+        )
+        self.db.add(job)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Another request queued it first; attach to theirs
+            await self.db.rollback()
+            return await self.get_active(topic_id, language)
+        return job
+
+    async def get(self, job_id: str) -> Optional[GenerationJob]:
+        return await self.db.scalar(select(GenerationJob).where(GenerationJob.id == job_id).execution_options(populate_existing=True))
+
+    async def get_active(self, topic_id: str, language: str) -> Optional[GenerationJob]:
+        return await self.db.scalar(select(GenerationJob).where(
+            GenerationJob.topic_id == topic_id,
+            GenerationJob.language == language,
+            GenerationJob.status.in_(ACTIVE)
+        ).execution_options(populate_existing=True))
+
+    async def get_latest(self, topic_id: str, language: str) -> Optional[GenerationJob]:
+        return await self.db.scalar(select(GenerationJob).where(
+            GenerationJob.topic_id == topic_id,
+            GenerationJob.language == language
+        ).order_by(GenerationJob.created_at.desc()).limit(1).execution_options(populate_existing=True))
+
+    async def lease(self, owner: str, lease_seconds: float) -> Optional[GenerationJob]:
+        """
+        Claim the next runnable job: queued and due, or running with an expired lease
+        (its worker died). One UPDATE, so two workers never claim the same job; on
+        Postgres, SKIP LOCKED keeps concurrent workers from queueing behind each other.
+        """
+        now = utcnow()
+        await self._fail_abandoned(now)
+        candidate = (
+            select(GenerationJob.id)
+            .where(or_(
+                and_(GenerationJob.status == QUEUED, GenerationJob.run_after <= now),
+                and_(GenerationJob.status == RUNNING, GenerationJob.lease_expires_at < now),
+            ))
+            .order_by(GenerationJob.priority, GenerationJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        job_id = await self.db.scalar(
+            update(GenerationJob)
+            .where(GenerationJob.id == candidate)
+            .values(
+                status=RUNNING, lease_owner=owner, lease_expires_at=now + timedelta(seconds=lease_seconds),
+                attempts=GenerationJob.attempts + 1, progress=None, updated_at=now
+            )
+            .returning(GenerationJob.id)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return await self.get(job_id) if job_id else None
+
+    async def _fail_abandoned(self, now: datetime) -> None:
+        # Expired leases that already used their last attempt are not retried
+        await self.db.execute(
+            update(GenerationJob)
+            .where(
+                GenerationJob.status == RUNNING,
+                GenerationJob.lease_expires_at < now,
+                GenerationJob.attempts >= GenerationJob.max_attempts
+            )
+            .values(status=FAILED, error="Lease expired", lease_owner=None, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def renew(self, job_id: str, owner: str, lease_seconds: float, new_output: str = "") -> bool:
+        """
+        Extend the lease and append `new_output` to the progress. False when the lease was lost to another worker.
+        """
+        now = utcnow()
+        values = {"lease_expires_at": now + timedelta(seconds=lease_seconds), "updated_at": now}
+        if new_output:
+            values["progress"] = func.coalesce(GenerationJob.progress, "") + new_output
+        result = await self.db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.lease_owner == owner, GenerationJob.status == RUNNING)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def complete(self, job_id: str, owner: str) -> None:
+        await self.db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.lease_owner == owner)
+            .values(status=DONE, lease_owner=None, lease_expires_at=None, progress=None, error=None, updated_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def release(self, job_id: str, owner: str, delay_seconds: float = 0.0) -> None:
+        """
+        Give a job back to the queue unfinished (worker shutdown, LM backend overloaded);
+        the attempt is not counted.
+        """
+        await self.db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.lease_owner == owner, GenerationJob.status == RUNNING)
+            .values(status=QUEUED, attempts=GenerationJob.attempts - 1, run_after=utcnow() + timedelta(seconds=delay_seconds), lease_owner=None, lease_expires_at=None, progress=None, updated_at=utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+    async def count_by_status(self) -> Dict[str, int]:
+        rows = await self.db.execute(select(GenerationJob.status, func.count()).group_by(GenerationJob.status))
+        return {status: count for status, count in rows}
+
+    async def fail(self, job_id: str, owner: str, error: str, backoff_seconds: float) -> str:
+        """
+        Record a failed attempt: back to the queue after `backoff_seconds * 2^(attempt-1)`,
+        or failed for good once max_attempts is used up. Returns the new status.
+        """
+        job = await self.get(job_id)
+        if not job or job.lease_owner != owner:
+            return job.status if job else FAILED
+        now = utcnow()
+        if job.attempts < job.max_attempts:
+            job.status = QUEUED
+            job.run_after = now + timedelta(seconds=backoff_seconds * 2 ** (job.attempts - 1))
+        else:
+            job.status = FAILED
+        job.lease_owner = None
+        job.lease_expires_at = None
+        job.progress = None
+        job.error = error[:2000]
+        job.updated_at = now
+        await self.db.commit()
+        return job.status
@@ -0,0 +1,217 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.config.llm import LLMOverloaded
+from app.database import AsyncSessionLocal
+from app.domains.jobs.models import GenerationJob, QUEUED
+from app.domains.jobs.repository import JobRepository
+from app.settings import get_settings
+
+# kind -> async handler(job, on_progress); on_progress(chunk) appends to the job's visible output
+Handler = Callable[[GenerationJob, Callable[[str], None]], Awaitable[None]]
+_handlers: Dict[str, Handler] = {}
+
+def register_handler(kind: str, handler: Handler) -> None:
+    _handlers[kind] = handler
+
+class LeaseLost(Exception):
+    pass
+
+class JobOutput:
+    """
+    Output of a job attempt running in this process. Clients attached in this process
+    follow it here instead of polling the job row.
+    """
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def append(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def close(self) -> None:
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake current followers; later ones wait on a fresh event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """
+        Yield the output from the start, then as it is appended, until the attempt ends.
+        """
+        sent = 0
+        while True:
+            changed = self._changed
+            if sent < len(self.chunks):
+                text = "".join(self.chunks[sent:])
+                sent = len(self.chunks)
+                yield text
+                continue
+            if self.done:
+                return
+            await changed.wait()
+
+class JobWorker:
+    """
+    Runs leased generation jobs, JOB_WORKER_CONCURRENCY at a time. While a job runs its
+    lease is renewed and its output so far is written back every JOB_PROGRESS_INTERVAL_SECONDS.
+    Runs inside the API process (JOB_WORKER_ENABLED) and/or as `python worker.py`.
+    """
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        self._started = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._outputs: Dict[str, JobOutput] = {}
+        self.running_jobs = 0
+        self.completed = 0
+        self.retried = 0
+        self.deferred = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def notify(self) -> None:
+        """
+        A job was queued in this process: lease it now instead of at the next poll.
+        """
+        self._wakeup.set()
+
+    def output(self, job_id: str) -> Optional[JobOutput]:
+        """
+        The running attempt's output if the job runs in this process.
+        """
+        return self._outputs.get(job_id)
+
+    async def wait_for_start(self, timeout: float) -> None:
+        """
+        Return when a job starts in this process, or after `timeout`.
+        """
+        try:
+            await asyncio.wait_for(self._started.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._slot()) for _ in range(max(1, get_settings().job_worker_concurrency))]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _slot(self) -> None:
+        settings = get_settings()
+        while True:
+            job = None
+            try:
+                async with AsyncSessionLocal() as db:
+                    job = await JobRepository(db).lease(self.owner, settings.job_lease_seconds)
+            except Exception as e:
+                # e.g. migrations not applied yet, or the DB is briefly unavailable
+                print(f"Job lease failed: {e}")
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.job_poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: GenerationJob) -> None:
+        settings = get_settings()
+        handler = _handlers.get(job.kind)
+        output = self._outputs[job.id] = JobOutput()
+        chunks = output.chunks
+        self.running_jobs += 1
+        started, self._started = self._started, asyncio.Event()
+        started.set()
+
+        async def heartbeat(task: asyncio.Task):
+            flushed = 0
+            loop = asyncio.get_running_loop()
+            renewed_at = loop.time()
+            while not task.done():
+                await asyncio.sleep(settings.job_progress_interval_seconds)
+                # Write when there is new output, or a third of the lease has passed
+                if len(chunks) == flushed and loop.time() - renewed_at < settings.job_lease_seconds / 3:
+                    continue
+                new_output = "".join(chunks[flushed:])
+                flushed = len(chunks)
+                async with AsyncSessionLocal() as db:
+                    if not await JobRepository(db).renew(job.id, self.owner, settings.job_lease_seconds, new_output):
+                        task.cancel() # Leased by another worker after we stalled
+                        return
+                renewed_at = loop.time()
+
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind '{job.kind}'")
+            task = asyncio.ensure_future(handler(job, output.append))
+            beat = asyncio.ensure_future(heartbeat(task))
+            try:
+                await task
+            except asyncio.CancelledError:
+                if beat.done():
+                    raise LeaseLost()
+                raise
+            finally:
+                beat.cancel()
+            async with AsyncSessionLocal() as db:
+                await JobRepository(db).complete(job.id, self.owner)
+            self.completed += 1
+        except LeaseLost:
+            print(f"Job {job.id} lost its lease")
+        except LLMOverloaded as e:
+            # Not the job's fault: try again later without using up an attempt
+            async with AsyncSessionLocal() as db:
+                await JobRepository(db).release(job.id, self.owner, e.retry_after)
+            self.deferred += 1
+        except asyncio.CancelledError:
+            # Shutdown: hand the job back without using up an attempt
+            async with AsyncSessionLocal() as db:
+                await JobRepository(db).release(job.id, self.owner)
+            raise
+        except Exception as e:
+            print(f"Job {job.id} ({job.kind}) failed: {e}")
+            async with AsyncSessionLocal() as db:
+                status = await JobRepository(db).fail(job.id, self.owner, str(e), settings.job_retry_backoff_seconds)
+            if status == QUEUED:
+                self.retried += 1
+            else:
+                self.failed += 1
+        finally:
+            # After the job row is final, so followers then read its outcome
+            self._outputs.pop(job.id, None)
+            output.close()
+            self.running_jobs -= 1
+
+    def stats(self) -> dict:
+        return {
+            "owner": self.owner,
+            "running": self.running,
+            "running_jobs": self.running_jobs,
+            "completed": self.completed,
+            "retried": self.retried,
+            "deferred": self.deferred,
+            "failed": self.failed,
+        }
+
+job_worker = JobWorker()
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.llm import run_llm
+from app.domains.study.repository import CachedAnswerRepository
+from app.settings import get_settings
+from app.utils.cache import TTLCache, register_cache
+
+# Words that point back into the conversation ("explain that again"). A later-turn
+# question without them may be answered from the cache; English only, so in other
+# languages only first-turn questions are looked up.
+BACK_REFERENCES = {"it", "its", "that", "this", "those", "these", "they", "them", "above", "earlier", "previous", "before", "again", "more", "also", "same"}
+
+def normalize_question(question: str) -> str:
+    text = unicodedata.normalize("NFKC", question).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+def is_first_turn(history: list) -> bool:
+    """
+    True when the session has nothing but its seed (topic prompt + explanation). Only
+    answers written from such a history are stored: later answers may lean on the
+    conversation (or its summary) and would leak into other students' sessions.
+    """
+    return len(history) <= 2 and not any(m["role"].startswith("summary") for m in history)
+
+def can_serve_from_cache(history: list, question: str, language: str) -> bool:
+    """
+    True when a stored answer fits this turn: the first turn, or a self-contained English question.
+    """
+    if is_first_turn(history):
+        return True
+    return language.lower() == "english" and not (set(normalize_question(question).split()) & BACK_REFERENCES)
+
+class Embedder:
+    """
+    Local sentence-transformers model, loaded on first use.
+    Requires the optional `sentence-transformers` package.
+    """
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError as e:
+                        raise RuntimeError("CHAT_ANSWER_CACHE_EMBEDDING_MODEL is set but 'sentence-transformers' is not installed (uv sync --extra semantic)") from e
+                    self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def embed(self, text: str) -> List[float]:
+        # Unit-length vectors: cosine similarity is a dot product
+        return self._load().encode(text, normalize_embeddings=True).tolist()
+
+class ChatAnswerCache:
+    """
+    Stored answers keyed on (topic, language, normalized question), with an optional
+    per-topic embedding index for similar questions. Answers live in the DB (shared by
+    all workers, kept across restarts); embedding indexes are per process.
+    """
+    def __init__(self):
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stored = 0
+        self._embedder: Optional[Embedder] = None
+        self._index = TTLCache(maxsize=1024, ttl=get_settings().chat_answer_cache_index_ttl_seconds)
+        register_cache("chat_answers", self)
+
+    @property
+    def enabled(self) -> bool:
+        return get_settings().chat_answer_cache_enabled
+
+    def _get_embedder(self) -> Optional[Embedder]:
+        model_name = get_settings().chat_answer_cache_embedding_model
+        if not model_name:
+            return None
+        if self._embedder is None or self._embedder.model_name != model_name:
+            self._embedder = Embedder(model_name)
+        return self._embedder
+
+    @staticmethod
+    def _since() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=get_settings().chat_answer_cache_ttl_seconds)
+
+    async def _similar(self, repo: CachedAnswerRepository, embedder: Embedder, topic_id: str, language: str, question: str) -> Optional[str]:
+        key = (topic_id, language)
+        index = self._index.get(key)
+        if index is None:
+            rows = await repo.list_embeddings(topic_id, language, self._since())
+            index = [(id, json.loads(embedding)) for id, embedding in rows]
+            self._index.set(key, index)
+        if not index:
+            return None
+
+        query = await run_llm(embedder.embed, question)
+        # A topic holds few questions, so a linear scan is enough
+        score, id = max((sum(a * b for a, b in zip(vector, query)), id) for id, vector in index)
+        if score < get_settings().chat_answer_cache_similarity_threshold:
+            return None
+
+        entry = await repo.get_by_id(id, self._since())
+        if entry is None:
+            # Expired or invalidated by another process
+            self._index.delete(key)
+            return None
+        return entry.answer
+
+    async def lookup(self, db: AsyncSession, topic_id: str, language: str, question: str) -> Optional[str]:
+        repo = CachedAnswerRepository(db)
+        entry = await repo.get(topic_id, language, normalize_question(question), self._since())
+        if entry:
+            self.exact_hits += 1
+            return entry.answer
+
+        embedder = self._get_embedder()
+        if embedder:
+            try:
+                answer = await self._similar(repo, embedder, topic_id, language, question)
+            except asyncio.TimeoutError:
+                answer = None
+            if answer is not None:
+                self.similar_hits += 1
+                return answer
+
+        self.misses += 1
+        return None
+
+    async def store(self, db: AsyncSession, topic_id: str, language: str, question: str, answer: str) -> None:
+        embedder = self._get_embedder()
+        embedding = await run_llm(embedder.embed, question) if embedder else None
+        await CachedAnswerRepository(db).put(topic_id, language, normalize_question(question), question, answer, embedding)
+        self._index.delete((topic_id, language))
+        self.stored += 1
+
+    async def invalidate_topic(self, db: AsyncSession, topic_id: str) -> int:
+        """
+        Drop every stored answer of a topic. Other processes stop serving them at once
+        (answers are re-read from the DB); their similarity indexes catch up on the next miss.
+        """
+        deleted = await CachedAnswerRepository(db).delete_by_topic(topic_id)
+        self._index.delete_where(lambda key: key[0] == topic_id)
+        return deleted
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.similar_hits
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "hits": hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+chat_answer_cache = ChatAnswerCache()
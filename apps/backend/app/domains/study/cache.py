@@ -0,0 +1,49 @@
+import hashlib
+import json
+from typing import Awaitable, Callable, Optional, Tuple
+
+from app.settings import Settings, get_settings, on_settings_reload
+from app.utils.cache import shared_cache
+
+# Rendered TopicResponse payloads and their ETags, per (topic, version, language).
+# With REDIS_URL every worker, the job workers and scripts share one cache, so a new
+# translation or a deleted topic is seen everywhere at once; otherwise each process keeps
+# its own and other processes' changes show up after TOPIC_CACHE_TTL_SECONDS.
+topic_response_cache = shared_cache(
+    get_settings().redis_url,
+    maxsize=get_settings().topic_cache_max_entries,
+    ttl=get_settings().topic_cache_ttl_seconds,
+    name="topic_responses",
+)
+
+@on_settings_reload
+def _configure_topic_cache(settings: Settings) -> None:
+    topic_response_cache.configure(settings.topic_cache_max_entries, settings.topic_cache_ttl_seconds)
+
+def _version_key(topic_id: str) -> str:
+    return f"topics:{topic_id}:version"
+
+async def cached_topic_response(topic_id: str, language: str, build: Callable[[], Awaitable[Optional[dict]]]) -> Optional[Tuple[dict, str]]:
+    """
+    Payload and ETag of a topic in `language`, building (and caching) it on a miss.
+    Returns None (uncached) when build() finds nothing.
+    """
+    version = await topic_response_cache.get_counter(_version_key(topic_id))
+    cache_key = f"topics:{topic_id}:v{version}:{language}"
+    cached = await topic_response_cache.get(cache_key)
+    if cached:
+        entry = json.loads(cached)
+        return entry["payload"], entry["etag"]
+
+    payload = await build()
+    if payload is None:
+        return None
+    etag = '"' + hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+    await topic_response_cache.set(cache_key, json.dumps({"payload": payload, "etag": etag}))
+    return payload, etag
+
+async def invalidate_topic(topic_id: str) -> None:
+    """
+    Drop every cached language of a topic (a new translation can change other languages' fallback too).
+    """
+    await topic_response_cache.incr(_version_key(topic_id))
@@ -1,34 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.domains.study.service import StudyService
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.config.llm import LLMOverloaded
+from app.database import get_async_db, get_async_read_db
+from app.domains.study.service import StudyService, GenerationPending
 from app.domains.auth import get_current_verified_user
 from app.domains.study.models import User
 from app.domains.study.schemas import (
     StudyChatRequest, StudyChatResponse, 
     StudyExplainRequest, StudyExplainResponse, 
     CreateTopicRequest, TopicResponse, ChatRequest, ChatResponse,
-    StartChatRequest, ChatSessionResponse
+    StartChatRequest, ChatSessionResponse, TopicGenerationPending
 )
 
 router = APIRouter(prefix="/study", tags=["Study"])
 
-@router.post("/topics", response_model=TopicResponse)
+def generation_pending_response(request: Request, pending: GenerationPending) -> JSONResponse:
+    # The job carries on without the request; the client re-attaches to its stream
+    stream_url = str(request.url_for("stream_topic_generation", topic_id=str(pending.topic_id)).include_query_params(language=pending.language))
+    body = TopicGenerationPending(
+        topic_id=str(pending.topic_id), job_id=str(pending.job_id), status=pending.status,
+        language=pending.language, stream_url=stream_url
+    )
+    return JSONResponse(status_code=202, content=body.model_dump(), headers={"Location": stream_url})
+
+@router.post("/topics", response_model=TopicResponse, responses={202: {"model": TopicGenerationPending}})
 async def create_topic(
+    request: Request,
     payload: CreateTopicRequest, 
     user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     service = StudyService(db)
     try:
         subject_id = payload.subject_id
         if not subject_id:
              # Fallback to 'uncategorized'
-            uncategorized = service.subject_repo.get_by_slug("uncategorized")
+            uncategorized = await service.subject_repo.get_by_slug("uncategorized")
             if not uncategorized:
                  # Should exist from seed, but handle just in case
-                uncategorized = service.subject_repo.create("Uncategorized", "uncategorized", is_featured=True)
+                uncategorized = await service.subject_repo.create("Uncategorized", "uncategorized", is_featured=True)
             subject_id = uncategorized.id
 
         topic = await service.get_or_create_topic(
@@ -40,6 +52,8 @@ async def create_topic(
             description=payload.description
         )
         return topic
+    except GenerationPending as pending:
+        return generation_pending_response(request, pending)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -50,7 +64,7 @@ async def stream_create_topic(
     language: str = "english",
     context: str = None,
     user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     SSE Endpoint for streaming topic creation.
@@ -59,9 +73,9 @@ async def stream_create_topic(
     
     # Handle Default Subject Logic (Duplicate from Create but needed here)
     if not subject_id:
-        uncategorized = service.subject_repo.get_by_slug("uncategorized")
+        uncategorized = await service.subject_repo.get_by_slug("uncategorized")
         if not uncategorized:
-            uncategorized = service.subject_repo.create("Uncategorized", "uncategorized", is_featured=True)
+            uncategorized = await service.subject_repo.create("Uncategorized", "uncategorized", is_featured=True)
         subject_id = uncategorized.id
 
     return StreamingResponse(
@@ -75,23 +89,49 @@ async def stream_create_topic(
         media_type="text/event-stream"
     )
 
+@router.get("/topics/{topic_id}/stream")
+async def stream_topic_generation(
+    topic_id: str,
+    language: str = "english",
+    user: User = Depends(get_current_verified_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    SSE Endpoint to re-attach to a topic's in-flight generation (same events as /topics/stream).
+    """
+    service = StudyService(db)
+    return StreamingResponse(
+        service.stream_topic_generation(topic_id, language=language),
+        media_type="text/event-stream"
+    )
+
 @router.get("/topics/{topic_id}", response_model=TopicResponse)
 async def get_topic(
     topic_id: str,
+    response: Response,
     language: str = "english",
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     service = StudyService(db)
-    topic = await service.get_topic_by_id(topic_id, language=language)
-    if not topic:
+    result = await service.get_topic_response(topic_id, language=language)
+    if not result:
         raise HTTPException(status_code=404, detail="Topic not found")
-    return topic
+
+    payload, etag = result
+    # Clients revalidate every time; a matching ETag is answered from cache with a 304
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return payload
 
 @router.post("/chat/start", response_model=ChatSessionResponse)
 async def start_chat(
     payload: StartChatRequest,
     user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     service = StudyService(db)
     try:
@@ -110,9 +150,10 @@ async def start_chat(
 async def study_chat(
     payload: ChatRequest, 
     user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
 ):
-    service = StudyService(db)
+    service = StudyService(db, read_db=read_db)
     try:
         result = await service.chat(
             session_id=payload.session_id,
@@ -123,14 +164,47 @@ async def study_chat(
         return ChatResponse(**result)
     except ValueError as ve:
         raise HTTPException(status_code=403, detail=str(ve))
+    except LLMOverloaded:
+        raise # 503 + Retry-After (main.py)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/explain", response_model=StudyExplainResponse)
+@router.post("/chat/stream")
+async def stream_study_chat(
+    payload: ChatRequest, 
+    user: User = Depends(get_current_verified_user),
+    db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    SSE Endpoint for streaming chat responses.
+    """
+    service = StudyService(db, read_db=read_db)
+
+    # Validate before streaming starts, so errors still map to a proper status code
+    session = await service.get_chat_session(payload.session_id)
+    if not session:
+        raise HTTPException(status_code=403, detail="Session not found")
+    if session.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    service.check_llm_capacity(payload.language)
+
+    return StreamingResponse(
+        service.chat_stream(
+            session_id=payload.session_id,
+            message=payload.message,
+            language=payload.language,
+            user=user
+        ),
+        media_type="text/event-stream"
+    )
+
+@router.post("/explain", response_model=StudyExplainResponse, responses={202: {"model": TopicGenerationPending}})
 async def study_explain(
+    request: Request,
     payload: StudyExplainRequest, 
     user: User = Depends(get_current_verified_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Legacy/Hybrid endpoint: generates explanation (Topic) and returns it with a new Session ID.
@@ -140,9 +214,9 @@ async def study_explain(
         subject_id = payload.subject_id
         if not subject_id:
             # Fallback to 'uncategorized' subject
-            uncategorized = service.subject_repo.get_by_slug("uncategorized")
+            uncategorized = await service.subject_repo.get_by_slug("uncategorized")
             if not uncategorized:
-                uncategorized = service.subject_repo.create("Uncategorized", "uncategorized", is_featured=True)
+                uncategorized = await service.subject_repo.create("Uncategorized", "uncategorized", is_featured=True)
             subject_id = uncategorized.id
 
         topic = await service.get_or_create_topic(
@@ -162,5 +236,7 @@ async def study_explain(
             slug=topic.slug,
             topic_id=topic.id
         )
+    except GenerationPending as pending:
+        return generation_pending_response(request, pending)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
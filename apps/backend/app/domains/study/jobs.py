@@ -0,0 +1,15 @@
+import json
+
+from app.config.llm import GENERATION, BACKGROUND
+from app.database import AsyncSessionLocal
+from app.domains.jobs.worker import register_handler
+from app.domains.study.service import StudyService, TOPIC_EXPLANATION, PREGENERATION
+
+async def run_topic_explanation(job, on_progress) -> None:
+    payload = json.loads(job.payload) if job.payload else {}
+    # Pre-generation waits behind chat and requested topics for an LM slot
+    priority = BACKGROUND if job.priority >= PREGENERATION else GENERATION
+    async with AsyncSessionLocal() as db:
+        await StudyService(db).explain_topic(job.topic_id, job.language, payload.get("context"), on_token=on_progress, priority=priority)
+
+register_handler(TOPIC_EXPLANATION, run_topic_explanation)
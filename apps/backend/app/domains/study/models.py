@@ -1,13 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.base import Base
+from app.base import Base, GUID
 import uuid
+from datetime import datetime, timezone
 
 class User(Base):
     __tablename__ = "users"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, index=True, nullable=False)
     firebase_uid = Column(String, unique=True, index=True, nullable=False)
     is_verified = Column(Boolean, default=False) # True if access code entered
@@ -15,10 +16,16 @@ class User(Base):
 
 class Topic(Base):
     __tablename__ = "topics"
+    __table_args__ = (
+        # Keyset pages of a subject's public topics (TopicRepository.list_summaries) and their count
+        Index("ix_topics_subject_id_is_public_title_id", "subject_id", "is_public", "title", "id"),
+        # One topic per slug within a subject: concurrent first requests for a title share one draft
+        Index("uq_topics_subject_id_slug", "subject_id", "slug", unique=True),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    subject_id = Column(String, ForeignKey("subjects.id"), nullable=False)
-    created_by_user_id = Column(String, ForeignKey("users.id"), nullable=True) 
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    subject_id = Column(GUID, ForeignKey("subjects.id"), nullable=False)
+    created_by_user_id = Column(GUID, ForeignKey("users.id"), nullable=True) 
     
     title = Column(String, nullable=False)
     slug = Column(String, index=True, nullable=False) 
@@ -36,9 +43,13 @@ class Topic(Base):
 
 class TopicTranslation(Base):
     __tablename__ = "topic_translations"
+    __table_args__ = (
+        # One translation per topic/language; also serves get_translation lookups
+        Index("uq_topic_translations_topic_id_language", "topic_id", "language", unique=True),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    topic_id = Column(String, ForeignKey("topics.id"), nullable=False)
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=False)
     language = Column(String, nullable=False) # e.g. 'yoruba', 'hausa'
     content = Column(Text, nullable=False)
     
@@ -48,26 +59,58 @@ class TopicTranslation(Base):
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_user_id_topic_id_created_at", "user_id", "topic_id", "created_at"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    topic_id = Column(String, ForeignKey("topics.id"), nullable=False)
-    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=False)
+    user_id = Column(GUID, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Rolling summary of the older part of the conversation (history compaction)
+    summary = Column(Text, nullable=True)
+    summary_until_message_id = Column(GUID, nullable=True) # Last ChatMessage folded into the summary
+    summary_token_count = Column(Integer, nullable=True)
     
     messages = relationship("ChatMessage", back_populates="session")
     topic = relationship("Topic")
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+    )
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id = Column(String, ForeignKey("chat_sessions.id"), nullable=False)
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = Column(GUID, ForeignKey("chat_sessions.id"), nullable=False)
     role = Column(String, nullable=False) # user/assistant
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    token_count = Column(Integer, nullable=True) # Estimated prompt tokens of content
+    # Set client-side (microsecond precision) so messages written in the same second keep their order
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
     
     session = relationship("ChatSession", back_populates="messages")
 
+class CachedAnswer(Base):
+    """
+    Answer to a first-turn/context-free chat question, served again for the same
+    (or, with embeddings enabled, a similar) question on the topic.
+    """
+    __tablename__ = "cached_answers"
+    __table_args__ = (
+        Index("uq_cached_answers_topic_id_language_question_key", "topic_id", "language", "question_key", unique=True),
+    )
+
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
+    topic_id = Column(GUID, ForeignKey("topics.id"), nullable=False)
+    language = Column(String, nullable=False)
+    question_key = Column(String, nullable=False) # Normalized question
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    embedding = Column(Text, nullable=True) # JSON list of floats, when an embedding model is configured
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+
 class InteractionLog(Base):
     """
     SQLAlchemy model for logging study interactions.
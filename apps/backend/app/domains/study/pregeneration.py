@@ -0,0 +1,119 @@
+import asyncio
+import itertools
+from typing import List, Optional, Set, Tuple
+
+from app.database import AsyncSessionLocal
+from app.domains.study.repository import TopicRepository
+from app.settings import get_settings
+
+# Lower runs first: seeded/featured topics before topics students just created
+FEATURED = 0
+NEW_TOPIC = 1
+
+def pregenerate_languages() -> List[str]:
+    return [language.strip().lower() for language in get_settings().pregenerate_languages.split(",") if language.strip()]
+
+class TranslationPregenerator:
+    """
+    Background queue of (topic, language) translations, generated ahead of the first
+    reader by a fixed number of workers so the LM backend never sees more than
+    PREGENERATE_CONCURRENCY of these at once. Jobs live in memory; the featured-topic
+    sweep re-enqueues anything lost to a restart.
+    """
+    def __init__(self):
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._pending: Set[Tuple[str, str]] = set()
+        self._order = itertools.count() # FIFO within a priority
+        self._tasks: List[asyncio.Task] = []
+        self.generated = 0
+        self.skipped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def enqueue(self, topic_id: str, language: str, priority: int = NEW_TOPIC) -> bool:
+        key = (str(topic_id), language.lower())
+        if not self.running or key in self._pending:
+            return False
+        self._pending.add(key)
+        self._queue.put_nowait((priority, next(self._order), key))
+        return True
+
+    def enqueue_topic(self, topic_id: str, created_in: str, featured: bool = False) -> None:
+        """
+        After a topic is created: queue the locales it does not have yet.
+        """
+        for language in pregenerate_languages():
+            if language != created_in.lower():
+                self.enqueue(topic_id, language, FEATURED if featured else NEW_TOPIC)
+
+    async def sweep(self) -> int:
+        """
+        Queue every featured topic's missing translations. Returns the number queued.
+        """
+        async with AsyncSessionLocal() as db:
+            missing = await TopicRepository(db).list_missing_translations(pregenerate_languages(), featured_only=True)
+        return sum(self.enqueue(topic_id, language, FEATURED) for topic_id, language in missing)
+
+    async def _work(self) -> None:
+        from app.domains.study.service import StudyService
+
+        while True:
+            _, _, key = await self._queue.get()
+            topic_id, language = key
+            try:
+                async with AsyncSessionLocal() as db:
+                    if await StudyService(db).pregenerate_translation(topic_id, language):
+                        self.generated += 1
+                    else:
+                        self.skipped += 1 # Already translated (e.g. by a reader) or no longer public
+            except Exception as e:
+                self.failed += 1
+                print(f"Translation Pre-generation Failed ({topic_id}, {language}): {e}")
+            finally:
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            try:
+                queued = await self.sweep()
+                if queued:
+                    print(f"Queued {queued} featured topic translations")
+            except Exception as e:
+                # e.g. migrations not applied yet; retried on the next sweep
+                print(f"Translation sweep failed: {e}")
+            await asyncio.sleep(get_settings().pregenerate_sweep_seconds)
+
+    def start(self, sweep: bool = True) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(max(1, get_settings().pregenerate_concurrency))]
+        if sweep:
+            self._tasks.append(asyncio.create_task(self._sweep_periodically()))
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "pending": len(self._pending),
+            "generated": self.generated,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+translation_pregenerator = TranslationPregenerator()
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+import dspy
+from typing import Dict, NamedTuple, Optional, Tuple
+from .prompts import StudyChat, TopicExplainer, ChatSummarizer
+from .tools import Calculator, CurrentTime
+from app.config.llm import get_lm_for_locale, LOCALE_LANGUAGES
+from app.settings import get_settings
+
+def get_full_language_name(code: str) -> str:
+    mapping = {
+        "pcm": "Broken English",
+        "pidgin": "Broken English",
+        "ha": "Hausa",
+        "ig": "Igbo",
+        "yo": "Yoruba",
+        "en": "English"
+    }
+    return mapping.get(code.lower(), code)
+
+class StudyAgent(dspy.Module):
+    def __init__(self):
+        super().__init__()
+        self.tools = [Calculator(), CurrentTime()]
+        self.react = dspy.ReAct(StudyChat, tools=self.tools)
+        self.summarizer = dspy.ChainOfThought(ChatSummarizer)
+
+    def forward(self, history: list, question: str, language: str):
+        full_language = get_full_language_name(language)
+        history_str = ""
+        for msg in history:
+            role = msg.get("sender", msg.get("role", "user"))
+            content = msg.get("content", "")
+            history_str += f"{role}: {content}\n"
+
+        return self.react(history=history_str, question=question, language=full_language)
+
+    def summarize(self, history: list, language: str):
+        full_language = get_full_language_name(language)
+        history_str = ""
+        for msg in history:
+            role = msg.get("sender", msg.get("role", "user"))
+            content = msg.get("content", "")
+            history_str += f"{role}: {content}\n"
+
+        return self.summarizer(conversation_history=history_str, language=full_language)
+
+# Locale codes that get the Pidgin explainer demos
+PIDGIN_LOCALES = {"pidgin", "pcm", "broken english"}
+
+class DemoArtifact(NamedTuple):
+    """
+    Few-shot demos compiled by scripts/optimize_pidgin.py, parsed once. A changed
+    file produces a new artifact; existing ones are never modified.
+    """
+    path: str
+    mtime_ns: int
+    demos: Tuple[dspy.Example, ...]
+
+def load_demo_artifact(path: str, mtime_ns: int) -> Optional[DemoArtifact]:
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        demos = data.get("generate.predict", {}).get("demos", []) or data.get("demos", [])
+        valid_demos = tuple(dspy.Example(**d).with_inputs("topic", "language", "context") for d in demos if d.get("explanation"))
+    except Exception as e:
+        print(f"Could not load demos from {path}: {e}")
+        return None
+    return DemoArtifact(path, mtime_ns, valid_demos)
+
+class PidginDemos:
+    """
+    The current Pidgin demo artifact, reloaded when PIDGIN_DEMOS_PATH or the file's
+    mtime changes, so re-running the optimizer needs no restart.
+    """
+    def __init__(self):
+        self._artifact: Optional[DemoArtifact] = None
+        self._key: Optional[tuple] = None # (path, mtime_ns) of the last load attempt
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[DemoArtifact]:
+        path = get_settings().pidgin_demos_path
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None # No file: no demos
+
+        key = (path, mtime_ns)
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    self._artifact = load_demo_artifact(path, mtime_ns) if mtime_ns is not None else None
+                    self._key = key
+        return self._artifact
+
+pidgin_demos = PidginDemos()
+
+class StudyPrograms:
+    """
+    The dspy programs for one locale. Built once and shared by all requests: calls
+    only read the modules (per-call state lives in dspy's thread/task-local settings),
+    and the DB session stays on StudyService.
+    """
+    def __init__(self, lm: Optional[dspy.LM], demos: Optional[DemoArtifact] = None):
+        self.lm = lm
+        self.demos = demos
+        self.agent = StudyAgent()
+        self.explainer = dspy.ChainOfThought(TopicExplainer)
+        if demos:
+            self.explainer.predict.demos = list(demos.demos)
+        if lm:
+            # Bound once here; streamed calls run outside the dspy.context of the request
+            self.agent.set_lm(lm)
+            self.explainer.set_lm(lm)
+
+# Other languages share the programs on the default LM (no locale LM, no demos)
+DEFAULT_PROGRAMS = "default"
+PROGRAM_LOCALES = set(LOCALE_LANGUAGES) | PIDGIN_LOCALES
+
+_programs: Dict[str, StudyPrograms] = {}
+_programs_lock = threading.Lock()
+
+def get_study_programs(language: str) -> StudyPrograms:
+    """
+    Shared programs for `language`, rebuilt when its LM (SIGHUP reload) or, for
+    Pidgin, its demo file changes.
+    """
+    key = language.lower()
+    if key not in PROGRAM_LOCALES:
+        # Request-supplied: don't build (and keep) programs per arbitrary string
+        key = DEFAULT_PROGRAMS
+    lm = get_lm_for_locale(key)
+    demos = pidgin_demos.get() if key in PIDGIN_LOCALES else None
+    programs = _programs.get(key)
+    if programs is None or programs.lm is not lm or programs.demos is not demos:
+        with _programs_lock:
+            programs = _programs.get(key)
+            if programs is None or programs.lm is not lm or programs.demos is not demos:
+                programs = StudyPrograms(lm, demos)
+                _programs[key] = programs
+    return programs
+
+def build_study_programs(languages) -> None:
+    """
+    Startup: build the programs before the first request.
+    """
+    for language in languages:
+        get_study_programs(language)
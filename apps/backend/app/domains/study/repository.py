@@ -1,7 +1,16 @@
+from sqlalchemy import delete, func, select, tuple_, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.domains.study.models import InteractionLog, User, Topic, ChatSession, ChatMessage
-from typing import Optional, List
+from app.domains.study.models import InteractionLog, User, Topic, TopicTranslation, ChatSession, ChatMessage, CachedAnswer
+from app.domains.study.cache import invalidate_topic
+from app.domains.subject.cache import invalidate_catalog
+from app.utils.tokens import estimate_tokens
+from app.utils.cursor import encode_cursor, decode_cursor
+from typing import Dict, Optional, List, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
 import json
+import uuid
 
 class StudyRepository:
     """
@@ -45,29 +54,30 @@ class StudyRepository:
         ).order_by(InteractionLog.id.asc()).all()
 
 class UserRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_firebase_uid(self, firebase_uid: str) -> Optional[User]:
-        return self.db.query(User).filter(User.firebase_uid == firebase_uid).first()
+    async def get_by_firebase_uid(self, firebase_uid: str) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.firebase_uid == firebase_uid))
         
-    def create(self, email: str, firebase_uid: str) -> User:
+    async def create(self, email: str, firebase_uid: str) -> User:
         user = User(email=email, firebase_uid=firebase_uid)
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         return user
         
-    def verify_access(self, user: User):
+    async def verify_access(self, user: User):
+        # UPDATE by id: `user` may be a cached instance that is not attached to this session
+        await self.db.execute(update(User).where(User.id == user.id).values(is_verified=True))
+        await self.db.commit()
         user.is_verified = True
-        self.db.commit()
-        self.db.refresh(user)
 
 class TopicRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create(self, title: str, slug: str, subject_id: str, content: str = None, description: str = None, user_id: str = None, is_featured: bool = False, is_public: bool = False, language: str = "english") -> Topic:
+    async def create(self, title: str, slug: str, subject_id: str, content: str = None, description: str = None, user_id: str = None, is_featured: bool = False, is_public: bool = False, language: str = "english") -> Topic:
         topic = Topic(
             title=title, slug=slug, subject_id=subject_id,
             content=content, description=description, created_by_user_id=user_id,
@@ -75,68 +85,265 @@ class TopicRepository:
             language=language
         )
         self.db.add(topic)
-        self.db.commit()
-        self.db.refresh(topic)
+        await self.db.commit()
+        await self.db.refresh(topic)
+        if is_public:
+            # Drafts are not listed; they invalidate the catalog when published
+            await invalidate_catalog()
         return topic
 
-    def get_by_id(self, id: str) -> Optional[Topic]:
-        return self.db.query(Topic).filter(Topic.id == id).first()
+    async def publish(self, topic: Topic, slug: Optional[str] = None) -> Topic:
+        """
+        Make a draft public, under `slug` unless another topic of the subject already uses it.
+        """
+        if slug and slug != topic.slug and not await self.get_by_slug_and_subject(slug, topic.subject_id):
+            topic.slug = slug
+        topic.is_public = True
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Another topic took the slug in the meantime; keep the draft's own
+            await self.db.rollback()
+            await self.db.refresh(topic)
+            topic.is_public = True
+            await self.db.commit()
+        await invalidate_catalog()
+        return topic
 
-    def get_by_slug_and_subject(self, slug: str, subject_id: str) -> Optional[Topic]:
-        return self.db.query(Topic).filter(Topic.slug == slug, Topic.subject_id == subject_id).first()
+    async def get_by_id(self, id: str) -> Optional[Topic]:
+        return await self.db.scalar(select(Topic).where(Topic.id == id))
 
-    def list_by_subject(self, subject_id: str, is_public_only: bool = True) -> List[Topic]:
-        q = self.db.query(Topic).filter(Topic.subject_id == subject_id)
+    async def get_by_slug_and_subject(self, slug: str, subject_id: str) -> Optional[Topic]:
+        return await self.db.scalar(select(Topic).where(Topic.slug == slug, Topic.subject_id == subject_id).limit(1))
+
+    async def get_by_title_and_subject(self, title: str, subject_id: str) -> Optional[Topic]:
+        # Case-insensitive: finds a topic published under a generated slug by the title it was asked for
+        return await self.db.scalar(select(Topic).where(
+            func.lower(Topic.title) == title.lower().strip(), Topic.subject_id == subject_id
+        ).order_by(Topic.created_at).limit(1))
+
+    async def list_by_subject(self, subject_id: str, is_public_only: bool = True) -> List[Topic]:
+        q = select(Topic).where(Topic.subject_id == subject_id)
         if is_public_only:
-            q = q.filter(Topic.is_public == True)
-        return q.all()
+            q = q.where(Topic.is_public == True)
+        return list(await self.db.scalars(q))
         
-    def list_featured(self) -> List[Topic]:
-        return self.db.query(Topic).filter(Topic.is_featured == True, Topic.is_public == True).all()
+    # Columns of TopicSummarySchema (never the content)
+    SUMMARY_COLUMNS = (Topic.id, Topic.subject_id, Topic.title, Topic.slug, Topic.description, Topic.is_featured)
+
+    async def list_summaries(self, subject_ids: Sequence[str], limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Tuple[list, Optional[str]]]:
+        """
+        First page of public topic summaries (ordered by title) for each subject, in one query,
+        with the cursor of each subject's next page. `cursor` continues a single subject.
+        """
+        after = decode_cursor(cursor, 2)
+        pages = []
+        for subject_id in subject_ids:
+            q = (
+                select(*self.SUMMARY_COLUMNS)
+                .where(Topic.subject_id == subject_id, Topic.is_public == True)
+                .order_by(Topic.title, Topic.id)
+                .limit(limit + 1)
+            )
+            if after:
+                q = q.where(tuple_(Topic.title, Topic.id) > tuple_(*after))
+            pages.append(q.subquery())
+        if not pages:
+            return {}
+
+        rows = (await self.db.execute(union_all(*[select(page) for page in pages]))).all()
+        result = {subject_id: ([], None) for subject_id in subject_ids}
+        for row in rows:
+            result[row.subject_id][0].append(row)
+        for subject_id, (topics, _) in result.items():
+            # Sub-selects of a UNION are not guaranteed to keep their order
+            topics.sort(key=lambda t: (t.title, t.id))
+            next_cursor = encode_cursor(topics[limit - 1].title, topics[limit - 1].id) if len(topics) > limit else None
+            result[subject_id] = (topics[:limit], next_cursor)
+        return result
+
+    async def count_public_by_subject(self, subject_ids: Sequence[str]) -> Dict[str, int]:
+        rows = await self.db.execute(
+            select(Topic.subject_id, func.count())
+            .where(Topic.subject_id.in_(subject_ids), Topic.is_public == True)
+            .group_by(Topic.subject_id)
+        )
+        return {subject_id: count for subject_id, count in rows}
 
-    def get_translation(self, topic_id: str, language: str):
-        # Local import to avoid circular dependency if models imported at top
-        from app.domains.study.models import TopicTranslation
-        return self.db.query(TopicTranslation).filter(
+    async def list_featured(self) -> List[Topic]:
+        return list(await self.db.scalars(select(Topic).where(Topic.is_featured == True, Topic.is_public == True)))
+
+    async def list_missing_translations(self, languages: Sequence[str], featured_only: bool = False) -> List[Tuple[str, str]]:
+        """
+        (topic_id, language) of public topics without a translation in one of `languages`.
+        """
+        query = select(Topic.id).where(Topic.is_public == True)
+        if featured_only:
+            query = query.where(Topic.is_featured == True)
+        topic_ids = list(await self.db.scalars(query))
+        existing = set((await self.db.execute(
+            select(TopicTranslation.topic_id, TopicTranslation.language).where(TopicTranslation.language.in_(languages))
+        )).all())
+        return [(topic_id, language) for topic_id in topic_ids for language in languages if (topic_id, language) not in existing]
+
+    async def get_translation(self, topic_id: str, language: str) -> Optional[TopicTranslation]:
+        return await self.db.scalar(select(TopicTranslation).where(
             TopicTranslation.topic_id == topic_id,
             TopicTranslation.language == language
-        ).first()
+        ).limit(1))
 
-    def add_translation(self, topic_id: str, language: str, content: str):
-        from app.domains.study.models import TopicTranslation
+    async def add_translation(self, topic_id: str, language: str, content: str) -> TopicTranslation:
         translation = TopicTranslation(
             topic_id=topic_id,
             language=language,
             content=content
         )
         self.db.add(translation)
-        self.db.commit()
-        self.db.refresh(translation)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Another worker/process stored this translation first; keep theirs
+            await self.db.rollback()
+            return await self.get_translation(topic_id, language)
+        await self.db.refresh(translation)
+        await invalidate_topic(topic_id)
         return translation
 
 class ChatRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_session(self, user_id: str, topic_id: str) -> ChatSession:
-        session = ChatSession(user_id=user_id, topic_id=topic_id)
+    async def create_session(self, user_id: str, topic_id: str, seed_messages: Sequence[Tuple[str, str]] = ()) -> ChatSession:
+        """
+        Create a session and its optional seed (role, content) messages in one transaction.
+        Keys and timestamps are set client-side, so no refresh round-trip is needed.
+        """
+        session = ChatSession(id=str(uuid.uuid4()), user_id=user_id, topic_id=topic_id, created_at=datetime.now(timezone.utc))
         self.db.add(session)
-        self.db.commit()
-        self.db.refresh(session)
+        self.db.add_all(self._build_messages(session.id, seed_messages))
+        await self.db.commit()
         return session
         
-    def get_session(self, session_id: str) -> Optional[ChatSession]:
-         return self.db.query(ChatSession).filter(ChatSession.id == session_id).first()
+    async def get_session(self, session_id: str) -> Optional[ChatSession]:
+         return await self.db.scalar(select(ChatSession).where(ChatSession.id == session_id))
     
-    def get_session_by_user_and_topic(self, user_id: str, topic_id: str) -> Optional[ChatSession]:
-        return self.db.query(ChatSession).filter(ChatSession.user_id == user_id, ChatSession.topic_id == topic_id).order_by(ChatSession.created_at.desc()).first()
-
-    def add_message(self, session_id: str, role: str, content: str) -> ChatMessage:
-        msg = ChatMessage(session_id=session_id, role=role, content=content)
-        self.db.add(msg)
-        self.db.commit()
-        self.db.refresh(msg)
-        return msg
-
-    def get_history(self, session_id: str) -> List[ChatMessage]:
-        return self.db.query(ChatMessage).filter(ChatMessage.session_id == session_id).order_by(ChatMessage.created_at.asc()).all()
+    async def get_session_by_user_and_topic(self, user_id: str, topic_id: str) -> Optional[ChatSession]:
+        return await self.db.scalar(
+            select(ChatSession)
+            .where(ChatSession.user_id == user_id, ChatSession.topic_id == topic_id)
+            .order_by(ChatSession.created_at.desc())
+            .limit(1)
+        )
+
+    @staticmethod
+    def _build_messages(session_id: str, messages: Sequence[Tuple[str, str]]) -> List[ChatMessage]:
+        # One microsecond apart so messages written together keep their order
+        now = datetime.now(timezone.utc)
+        return [
+            ChatMessage(
+                id=str(uuid.uuid4()), session_id=session_id, role=role, content=content,
+                token_count=estimate_tokens(content), created_at=now + timedelta(microseconds=i)
+            )
+            for i, (role, content) in enumerate(messages)
+        ]
+
+    async def add_messages(self, session_id: str, messages: Sequence[Tuple[str, str]]) -> List[ChatMessage]:
+        """
+        Write several (role, content) messages in a single transaction (one commit, no refresh).
+        """
+        msgs = self._build_messages(session_id, messages)
+        self.db.add_all(msgs)
+        await self.db.commit()
+        return msgs
+
+    async def append_turn(self, session_id: str, question: str, answer: str) -> List[ChatMessage]:
+        return await self.add_messages(session_id, [("user", question), ("assistant", answer)])
+
+    async def add_message(self, session_id: str, role: str, content: str) -> ChatMessage:
+        return (await self.add_messages(session_id, [(role, content)]))[0]
+
+    async def get_history(self, session_id: str) -> List[ChatMessage]:
+        return list(await self.db.scalars(
+            select(ChatMessage).where(ChatMessage.session_id == session_id).order_by(ChatMessage.created_at.asc())
+        ))
+
+    async def get_history_after(self, session_id: str, message_id: Optional[str]) -> List[ChatMessage]:
+        """
+        Messages that come after `message_id` (exclusive), oldest first.
+        Falls back to the full history if there is no cut-off message.
+        """
+        if not message_id:
+            return await self.get_history(session_id)
+
+        cutoff = await self.db.scalar(select(ChatMessage.created_at).where(ChatMessage.id == message_id))
+        if cutoff is None:
+            return await self.get_history(session_id)
+
+        # >= so rows sharing the cut-off timestamp (legacy second-resolution rows) are sliced in Python
+        messages = list(await self.db.scalars(
+            select(ChatMessage).where(
+                ChatMessage.session_id == session_id,
+                ChatMessage.created_at >= cutoff
+            ).order_by(ChatMessage.created_at.asc())
+        ))
+        ids = [m.id for m in messages]
+        return messages[ids.index(message_id) + 1:] if message_id in ids else messages
+
+    async def update_summary(self, session: ChatSession, summary: str, until_message_id: str) -> ChatSession:
+        session.summary = summary
+        session.summary_until_message_id = until_message_id
+        session.summary_token_count = estimate_tokens(summary)
+        await self.db.commit()
+        return session
+
+class CachedAnswerRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, topic_id: str, language: str, question_key: str, since: datetime) -> Optional[CachedAnswer]:
+        return await self.db.scalar(select(CachedAnswer).where(
+            CachedAnswer.topic_id == topic_id,
+            CachedAnswer.language == language,
+            CachedAnswer.question_key == question_key,
+            CachedAnswer.created_at >= since
+        ))
+
+    async def get_by_id(self, id: str, since: datetime) -> Optional[CachedAnswer]:
+        return await self.db.scalar(select(CachedAnswer).where(CachedAnswer.id == id, CachedAnswer.created_at >= since))
+
+    async def list_embeddings(self, topic_id: str, language: str, since: datetime) -> List[Tuple[str, str]]:
+        """
+        (id, JSON embedding) of a topic/language's live answers; the similarity index is built from these.
+        """
+        rows = await self.db.execute(select(CachedAnswer.id, CachedAnswer.embedding).where(
+            CachedAnswer.topic_id == topic_id,
+            CachedAnswer.language == language,
+            CachedAnswer.embedding.is_not(None),
+            CachedAnswer.created_at >= since
+        ))
+        return [tuple(row) for row in rows]
+
+    async def put(self, topic_id: str, language: str, question_key: str, question: str, answer: str, embedding: Optional[list] = None) -> None:
+        """
+        Store an answer, replacing an expired one for the same question.
+        """
+        await self.db.execute(delete(CachedAnswer).where(
+            CachedAnswer.topic_id == topic_id,
+            CachedAnswer.language == language,
+            CachedAnswer.question_key == question_key
+        ))
+        self.db.add(CachedAnswer(
+            id=str(uuid.uuid4()), topic_id=topic_id, language=language, question_key=question_key,
+            question=question, answer=answer, embedding=json.dumps(embedding) if embedding else None,
+            created_at=datetime.now(timezone.utc)
+        ))
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # A concurrent request stored the same question first
+            await self.db.rollback()
+
+    async def delete_by_topic(self, topic_id: str) -> int:
+        result = await self.db.execute(delete(CachedAnswer).where(CachedAnswer.topic_id == topic_id))
+        await self.db.commit()
+        return result.rowcount
@@ -48,6 +48,14 @@ class TopicResponse(BaseModel):
     is_featured: bool
     language: str = "english"
 
+class TopicGenerationPending(BaseModel):
+    # 202: generation outlived the request; follow it on stream_url (same events as /topics/stream)
+    topic_id: str
+    job_id: str
+    status: str
+    language: str
+    stream_url: str
+
 class StartChatRequest(BaseModel):
     topic_id: str
     topic_name: Optional[str] = None
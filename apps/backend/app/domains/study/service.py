@@ -1,145 +1,268 @@
+import asyncio
+import json
+import logging
 import dspy
-from sqlalchemy.orm import Session
-from .prompts import StudyChat, TopicExplainer, ChatSummarizer
-from .tools import Calculator, CurrentTime
-from app.config.llm import get_lm_for_locale
+from typing import Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .programs import StudyAgent, get_full_language_name, get_study_programs # noqa: F401 (re-exported)
+from app.config.llm import get_lm_for_locale, get_limiter, llm_slot, run_llm, LLMOverloaded, CHAT, GENERATION, BACKGROUND
+from app.settings import get_settings
+from app.database import AsyncSessionLocal
 from app.domains.study.repository import StudyRepository, TopicRepository, ChatRepository, UserRepository
 from app.domains.subject.repository import SubjectRepository
-from app.domains.study.models import Topic, User, ChatSession
-
-def get_full_language_name(code: str) -> str:
-    mapping = {
-        "pcm": "Broken English",
-        "pidgin": "Broken English",
-        "ha": "Hausa",
-        "ig": "Igbo",
-        "yo": "Yoruba",
-        "en": "English"
-    }
-    return mapping.get(code.lower(), code)
-
-class StudyAgent(dspy.Module):
-    def __init__(self):
-        super().__init__()
-        self.tools = [Calculator(), CurrentTime()]
-        self.react = dspy.ReAct(StudyChat, tools=self.tools)
-        self.summarizer = dspy.ChainOfThought(ChatSummarizer)
-
-    def forward(self, history: list, question: str, language: str):
-        full_language = get_full_language_name(language)
-        history_str = ""
-        for msg in history:
-            role = msg.get("sender", msg.get("role", "user")) 
-            content = msg.get("content", "")
-            history_str += f"{role}: {content}\n"
-            
-        return self.react(history=history_str, question=question, language=full_language)
-
-    def summarize(self, history: list, language: str):
-        full_language = get_full_language_name(language)
-        history_str = ""
-        for msg in history:
-            role = msg.get("sender", msg.get("role", "user"))
-            content = msg.get("content", "")
-            history_str += f"{role}: {content}\n"
-        
-        return self.summarizer(conversation_history=history_str, language=full_language)
+from app.domains.study.models import Topic, TopicTranslation, User, ChatSession
+from app.domains.jobs.models import GenerationJob, DONE, FAILED
+from app.domains.jobs.repository import JobRepository, ACTIVE
+from app.domains.jobs.worker import job_worker
+from app.domains.study.schemas import TopicResponse
+from app.domains.study.cache import cached_topic_response
+from app.domains.study.answer_cache import chat_answer_cache, can_serve_from_cache, is_first_turn
+from app.domains.study.pregeneration import translation_pregenerator
+from app.utils.singleflight import SingleFlight
+from app.utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXPLAINER_CONTEXT = "Do not include the topic title as a heading. Start directly with the definition or explanation. Structure the response clearly with headings for 'What is it?', 'Key Concepts', 'Common Misconceptions', and 'Exam Notes (JAMB/WAEC)'."
+
+# Generation job kind and priorities (lower runs first)
+TOPIC_EXPLANATION = "topic_explanation"
+INTERACTIVE = 0
+PREGENERATION = 10
+
+def job_wait_timeout() -> float:
+    """
+    How long a request waits for a generation job: a turn for a worker slot plus every
+    attempt (an LM slot, the call itself, a lease that may expire) and the retry backoff between them.
+    """
+    settings = get_settings()
+    per_attempt = settings.llm_queue_timeout + settings.llm_request_timeout + settings.job_lease_seconds
+    # backoff * (1 + 2 + ... + 2^(attempts-2))
+    backoff = settings.job_retry_backoff_seconds * (2 ** max(settings.job_max_attempts - 1, 0) - 1)
+    return (settings.job_max_attempts + 1) * per_attempt + backoff
+
+def request_wait_timeout() -> float:
+    """
+    How long a request waits for generation before answering 202: one LM slot and one call.
+    Longer jobs (retries, a backlog, no worker running) are followed on the stream endpoint.
+    """
+    settings = get_settings()
+    return min(settings.llm_queue_timeout + settings.llm_request_timeout, job_wait_timeout())
+
+class GenerationPending(Exception):
+    """
+    A topic's generation job is still queued or running when the request stops waiting for it.
+    """
+    def __init__(self, topic_id: str, language: str, job: GenerationJob):
+        super().__init__(f"Generation of topic {topic_id} ({language}) is still {job.status}")
+        self.topic_id = topic_id
+        self.language = language
+        self.job_id = job.id
+        self.status = job.status
+
+def title_slug(title: str) -> str:
+    # The slug requests look topics up by before the LLM picks one
+    return title.lower().strip().replace(" ", "-")
+
+# One background compaction per chat session at a time
+history_compaction = SingleFlight()
+
+async def _compact_history_in_background(session_id: str, language: str) -> None:
+    # Runs after the response, so it gets its own DB session
+    async with AsyncSessionLocal() as db:
+        try:
+            await StudyService(db).compact_history(session_id, language)
+        except Exception as e:
+            print(f"History Compaction Failed: {e}")
+
+def schedule_history_compaction(session_id: str, language: str) -> None:
+    asyncio.ensure_future(
+        history_compaction.do(session_id, lambda: _compact_history_in_background(session_id, language))
+    )
 
 class StudyService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession, read_db: Optional[AsyncSession] = None):
         self.db = db
-        self.module = StudyAgent()
         self.topic_repo = TopicRepository(db)
         self.chat_repo = ChatRepository(db)
+        # Replica-backed reads (chat history, answer lookups); the primary when no replica is configured
+        self.read_db = read_db or db
+        self.read_chat_repo = ChatRepository(read_db or db)
         self.subject_repo = SubjectRepository(db)
         self.user_repo = UserRepository(db)
 
     async def get_or_create_topic(self, subject_id: str, title: str, user: User, language: str = "english", context_instruction: str = None, description: str = None) -> Topic:
         """
-        Get existing topic (by Title rough match or generated slug) or Create new one with LLM content.
+        Get existing topic (by Title rough match) or Create new one with LLM content.
+        Generation runs as a job, so it completes even if this request goes away. Raises
+        GenerationPending if it is still running after request_wait_timeout().
         """
-        # Setup LLM Context immediately
-        lm = get_lm_for_locale(language)
-        context_manager = dspy.context(lm=lm) if lm else dspy.context()
-        
-        full_language = get_full_language_name(language)
-        explainer = dspy.ChainOfThought(TopicExplainer)
-        self._load_pidgin_demos(explainer) # Optimization
+        topic, translation = await self._find_or_create_draft(subject_id, title, user, language, description)
+        if not translation:
+            topic_id = topic.id
+            job = await self.enqueue_explanation(topic_id, language, context_instruction)
+            job = await self._wait_for_job(job.id, request_wait_timeout())
+            if job and job.status in ACTIVE:
+                raise GenerationPending(topic_id, language, job)
+            await self.db.refresh(topic) # Published under the generated slug
+            translation = await self.topic_repo.get_translation(topic.id, language)
+            if not translation:
+                raise RuntimeError(job.error or "Failed to generate content")
 
-        default_context = "Do not include the topic title as a heading. Start directly with the definition or explanation. Structure the response clearly with headings for 'What is it?', 'Key Concepts', 'Common Misconceptions', and 'Exam Notes (JAMB/WAEC)'."
-        final_context = context_instruction or default_context
+        # Populate content for response flexibility (models expect topic.content)
+        topic.content = translation.content
+        return topic
 
-        # 1. Check simplistic Slug match first
-        simple_slug = title.lower().strip().replace(" ", "-") # Very basic
-        existing = self.topic_repo.get_by_slug_and_subject(simple_slug, subject_id)
-        
+    async def _find_or_create_draft(self, subject_id: str, title: str, user: User, language: str, description: str = None) -> Tuple[Topic, Optional[TopicTranslation]]:
+        """
+        The topic matching `title` and its translation in `language`, or a new private
+        draft (published once its explanation is generated).
+        """
+        # Simplistic Slug match, then the title (the topic may have been published under a generated slug)
+        simple_slug = title_slug(title)
+        existing = await self.topic_repo.get_by_slug_and_subject(simple_slug, subject_id) or await self.topic_repo.get_by_title_and_subject(title, subject_id)
         if existing:
             # STRICT NORMALIZATION: Always check translation table
-            translation = self.topic_repo.get_translation(existing.id, language)
-            if translation:
-                 # Populate content for response flexibility (though strictly we return Topic + Content usually separate, but models expect topic.content)
-                 existing.content = translation.content
-                 return existing
-            
-            # Generate missing translation (even if language is English but missing in translations table)
-            with context_manager:
-                prediction = explainer(topic=title, language=full_language, context=final_context)
-            self.topic_repo.add_translation(existing.id, language, prediction.explanation)
-            existing.content = prediction.explanation
-            return existing
+            return existing, await self.topic_repo.get_translation(existing.id, language)
 
-        # 2. Generate Content & Slug using LLM (if not existing)
-        with context_manager:
-            prediction = explainer(topic=title, language=full_language, context=final_context)
-            
-        generated_slug = prediction.slug
-        content = prediction.explanation
-        
-        # Fallback slug if LLM failed
-        if not generated_slug:
-            generated_slug = simple_slug
-        
-        # Check existence by generated slug
-        existing_by_slug = self.topic_repo.get_by_slug_and_subject(generated_slug, subject_id)
-        if existing_by_slug:
-             # Check translation 
-             translation = self.topic_repo.get_translation(existing_by_slug.id, language)
-             if translation:
-                 existing_by_slug.content = translation.content
-                 return existing_by_slug
-             
-             self.topic_repo.add_translation(existing_by_slug.id, language, content)
-             existing_by_slug.content = content
-             return existing_by_slug
-            
-        # Create Topic (Metadata)
-        topic = self.topic_repo.create(
-            title=title,
-            slug=generated_slug,
-            subject_id=subject_id,
-            content=None, # LEGACY: Content now lives in translations. topic.content is legacy/fallback.
-            description=description, 
-            user_id=user.id,
-            is_public=True,
-            is_featured=False,
-            language=language # Original language metadata
+        try:
+            draft_topic = await self.topic_repo.create(
+                title=title,
+                slug=simple_slug,
+                subject_id=subject_id,
+                content=None, # LEGACY: Content in translation only
+                description=description or f"Explanation of {title}",
+                user_id=user.id,
+                is_public=False,
+                is_featured=False,
+                language=language # Persist creation language
+            )
+        except IntegrityError:
+            # A concurrent request created the draft first; join it (and its job)
+            await self.db.rollback()
+            existing = await self.topic_repo.get_by_slug_and_subject(simple_slug, subject_id)
+            return existing, await self.topic_repo.get_translation(existing.id, language)
+        return draft_topic, None
+
+    async def enqueue_explanation(self, topic_id: str, language: str, context_instruction: str = None, priority: int = INTERACTIVE) -> GenerationJob:
+        """
+        Queue generation of a topic's explanation in `language`, or join the job already doing it.
+        """
+        job = await JobRepository(self.db).enqueue(
+            TOPIC_EXPLANATION, topic_id, language,
+            payload={"context": context_instruction} if context_instruction else None,
+            priority=priority, max_attempts=get_settings().job_max_attempts
         )
-        
-        # ALWAYS ADD TRANSLATION (Normalized)
-        self.topic_repo.add_translation(topic.id, language, content)
-        
-        # Populate for return
-        topic.content = content
-             
-        return topic
+        job_worker.notify()
+        return job
+
+    async def explain_topic(self, topic_id: str, language: str, context_instruction: str = None, on_token=None, priority: int = GENERATION) -> None:
+        """
+        Job handler: generate and store a topic's explanation in `language`, streaming
+        tokens to on_token. A draft topic is published under the slug the LLM picked, if it is free.
+        `priority` is the LLM call priority (BACKGROUND for pre-generation).
+        """
+        topic = await self.topic_repo.get_by_id(topic_id)
+        if not topic:
+            return # Deleted while queued
+        if await self.topic_repo.get_translation(topic.id, language):
+            return
+
+        programs = get_study_programs(language)
+        prediction = await self._stream_prediction(
+            programs.explainer, "explanation", on_token or (lambda chunk: None),
+            lm=programs.lm, priority=priority, topic=topic.title, language=get_full_language_name(language), context=context_instruction or DEFAULT_EXPLAINER_CONTEXT
+        )
+
+        created = not topic.is_public
+        if created:
+            await self.topic_repo.publish(topic, slug=prediction.slug) # Now public (and listed)
+
+        # ALWAYS Add to translation table (Normalized)
+        await self.topic_repo.add_translation(topic.id, language, prediction.explanation)
+        if created:
+            translation_pregenerator.enqueue_topic(topic.id, created_in=language)
+
+    async def pregenerate_translation(self, topic_id: str, language: str) -> bool:
+        """
+        Background: generate a public topic's missing translation through a low-priority job,
+        which a reader asking for the same translation attaches to. Returns False when there was nothing to do.
+        """
+        topic = await self.topic_repo.get_by_id(topic_id)
+        if not topic or not topic.is_public:
+            return False
+        if await self.topic_repo.get_translation(topic.id, language):
+            return False
+
+        job = await self.enqueue_explanation(topic.id, language, priority=PREGENERATION)
+        job = await self._wait_for_job(job.id, job_wait_timeout())
+        if job.status in ACTIVE:
+            raise RuntimeError("Generation is still queued or running; try again shortly")
+        if job.status != DONE:
+            raise RuntimeError(job.error or f"Job {job.status}")
+        return True
+
+    async def _job_progress(self, job_id: str):
+        """
+        Yield a job's new output as it is produced, until the job is no longer active.
+        A job running in this process is followed in memory; otherwise its row is polled.
+        """
+        jobs = JobRepository(self.db)
+        sent = ""
+
+        def advance(text: str) -> Optional[str]:
+            # A retried attempt starts over; wait until it has passed what was already sent
+            nonlocal sent
+            if len(text) > len(sent) and text.startswith(sent):
+                delta, sent = text[len(sent):], text
+                return delta
+            return None
+
+        while True:
+            output = job_worker.output(job_id)
+            if output:
+                text = ""
+                async for chunk in output.follow():
+                    text += chunk
+                    delta = advance(text)
+                    if delta:
+                        yield delta
+
+            await self.db.commit() # End the read transaction, so the next read sees the worker's writes
+            job = await jobs.get(job_id)
+            if not job or job.status not in ACTIVE:
+                return
+            if output is None:
+                delta = advance(job.progress or "")
+                if delta:
+                    yield delta
+                # Queued, or running in another process
+                await job_worker.wait_for_start(get_settings().job_progress_interval_seconds)
+
+    async def _wait_for_job(self, job_id: str, timeout: float) -> Optional[GenerationJob]:
+        """
+        The job once it has finished, or as it stands after `timeout` seconds (still queued
+        or running: no worker running, or the workers are behind).
+        """
+        async def drain():
+            async for _ in self._job_progress(job_id):
+                pass
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self.db.rollback() # The wait may have been cut off mid-query
+        return await JobRepository(self.db).get(job_id)
 
     async def get_topic_by_id(self, topic_id: str, language: str = "english") -> Topic:
-        topic = self.topic_repo.get_by_id(topic_id)
+        # Primary, not the replica: this builds the topic cache entry for the current version, and a
+        # lagging replica would pin the pre-write content under it until the TTL
+        topic = await self.topic_repo.get_by_id(topic_id)
         if not topic:
             return None
             
         # NORMALIZE: Fetch content from translation
-        translation = self.topic_repo.get_translation(topic.id, language)
+        translation = await self.topic_repo.get_translation(topic.id, language)
         if translation:
             topic.content = translation.content
         else:
@@ -147,26 +270,36 @@ class StudyService:
             # Or return None for content? 
             # For now, let's try to get content in Topic's native language as fallback
             # But strictly, we should probably return empty or original if same.
-            fallback = self.topic_repo.get_translation(topic.id, topic.language)
+            fallback = await self.topic_repo.get_translation(topic.id, topic.language)
             if fallback:
                 topic.content = fallback.content
             # If even fallback missing (shouldn't happen with migration), topic.content is naturally whatever DB has (which is legacy value)
             
         return topic
     
+    async def get_topic_response(self, topic_id: str, language: str = "english") -> Optional[Tuple[dict, str]]:
+        """
+        Rendered TopicResponse payload and its ETag, served from the topic cache when possible.
+        """
+        async def build() -> Optional[dict]:
+            topic = await self.get_topic_by_id(topic_id, language=language)
+            if not topic:
+                return None
+            return TopicResponse.model_validate(topic, from_attributes=True).model_dump(mode="json")
+
+        return await cached_topic_response(topic_id, language, build)
+
     async def start_chat_session(self, user: User, topic_id: str, topic_name: str = None, initial_context: str = None, language: str = "english") -> ChatSession:
         
         # 1. Reuse existing session if available for this topic
-        existing = self.chat_repo.get_session_by_user_and_topic(user.id, topic_id)
+        existing = await self.chat_repo.get_session_by_user_and_topic(user.id, topic_id)
         if existing:
             # If session exists, we resume it. 
             # We do NOT re-seed the context as history already exists.
             return existing
 
-        # 2. Create new session
-        session = self.chat_repo.create_session(user.id, topic_id)
-        
-        # 3. Seed History (Localized)
+        # 2. Seed History (Localized)
+        seed_messages = []
         if topic_name and initial_context:
             # Localize the "Explain" prompt
             lang_lower = language.lower()
@@ -181,16 +314,76 @@ class StudyService:
             elif lang_lower in ["pcm", "pidgin", "broken english"]:
                  initial_prompt = f"Abeg explain {topic_name}"
             
-            self.chat_repo.add_message(session.id, "user", initial_prompt)
-            self.chat_repo.add_message(session.id, "assistant", initial_context)
-            
-        return session
+            seed_messages = [("user", initial_prompt), ("assistant", initial_context)]
+
+        # 3. Create new session and its seed messages in one transaction
+        return await self.chat_repo.create_session(user.id, topic_id, seed_messages=seed_messages)
+
+    def check_llm_capacity(self, language: str, priority: int = CHAT) -> None:
+        """
+        Raise LLMOverloaded if `language`'s LM backend would reject a call now
+        (lets streaming endpoints answer 503 before the stream starts).
+        """
+        get_limiter(get_study_programs(language).lm).check(priority)
 
     async def get_chat_session(self, session_id: str) -> ChatSession:
-        return self.chat_repo.get_session(session_id)
+        return await self.chat_repo.get_session(session_id)
+
+    async def _unsummarized_messages(self, session: ChatSession) -> list:
+        # Only the turns after the summary cut-off are loaded: O(recent turns), not O(all turns)
+        return await self.read_chat_repo.get_history_after(session.id, session.summary_until_message_id)
+
+    async def _assemble_history(self, session: ChatSession):
+        """
+        Prompt history for a turn: the rolling summary (if any) followed by the messages
+        it does not cover yet. Also reports whether the two together have outgrown the token budget.
+        """
+        settings = get_settings()
+        messages = await self._unsummarized_messages(session)
+
+        history_list = []
+        if session.summary:
+            history_list.append({"role": "summary of earlier conversation", "content": session.summary})
+        history_list += [{"role": m.role, "content": m.content} for m in messages]
+
+        needs_compaction = (
+            len(messages) > settings.chat_history_keep_messages
+            and (session.summary_token_count or 0) + sum(m.token_count or estimate_tokens(m.content) for m in messages) > settings.chat_history_token_budget
+        )
+        return history_list, needs_compaction
+
+    async def compact_history(self, session_id: str, language: str) -> None:
+        """
+        Fold everything but the most recent messages into the session's rolling summary.
+        """
+        session = await self.chat_repo.get_session(session_id)
+        if not session:
+            return
+
+        keep = get_settings().chat_history_keep_messages
+        messages = await self._unsummarized_messages(session)
+        if len(messages) <= keep:
+            return
+
+        to_fold = messages[:-keep] if keep else messages
+        fold_history = [{"role": m.role, "content": m.content} for m in to_fold]
+        if session.summary:
+            # Incremental: previous summary + newly aged-out turns
+            fold_history.insert(0, {"role": "summary of earlier conversation", "content": session.summary})
+
+        lm = get_lm_for_locale(language)
+        context_manager = dspy.context(lm=lm) if lm else dspy.context()
+
+        def run_dspy():
+            with context_manager:
+                return get_study_programs(language).agent.summarize(history=fold_history, language=language)
+
+        async with llm_slot(lm, BACKGROUND) as slot:
+            prediction = await run_llm(slot.bind(run_dspy))
+        await self.chat_repo.update_summary(session, prediction.summary, to_fold[-1].id)
 
     async def chat(self, session_id: str, message: str, language: str, user: User):
-        session = self.chat_repo.get_session(session_id)
+        session = await self.chat_repo.get_session(session_id)
         if not session:
              raise ValueError("Session not found")
         
@@ -198,202 +391,253 @@ class StudyService:
         if session.user_id != user.id:
              raise ValueError("Unauthorized")
 
-        # Get history
-        messages = self.chat_repo.get_history(session_id)
-        history_list = [{"role": m.role, "content": m.content} for m in messages]
-        
-        # Add User Message to DB
-        self.chat_repo.add_message(session_id, "user", message)
-        
-        # Call LLM
-        lm = get_lm_for_locale(language)
-        context_manager = dspy.context(lm=lm) if lm else dspy.context()
-        
-        # agent = self.module # StudyAgent instance
-        # Response
-        try:
-             with context_manager:
-                 prediction = self.module.forward(history=history_list, question=message, language=language)
-             answer = prediction.answer
-        except Exception as e:
-             print(f"Chat Error: {e}")
-             answer = "I'm having trouble thinking right now. Please try again."
+        # Get history (rolling summary + recent turns)
+        history_list, needs_compaction = await self._assemble_history(session)
+
+        use_cache = chat_answer_cache.enabled and can_serve_from_cache(history_list, message, language)
+        answer = await self._cached_answer(session.topic_id, language, message) if use_cache else None
+        # Only answers written from the session seed alone are safe to share
+        store_answer = chat_answer_cache.enabled and is_first_turn(history_list)
 
-        # Add AI Message to DB
-        self.chat_repo.add_message(session_id, "assistant", answer)
+        if answer is None:
+            # Call LLM
+            lm = get_lm_for_locale(language)
+            context_manager = dspy.context(lm=lm) if lm else dspy.context()
+
+            # Run the ReAct loop on the LLM worker pool so the event loop stays free
+            def run_dspy():
+                with context_manager:
+                    return get_study_programs(language).agent.forward(history=history_list, question=message, language=language)
+
+            try:
+                 async with llm_slot(lm, CHAT) as slot:
+                     prediction = await run_llm(slot.bind(run_dspy))
+                 answer = prediction.answer
+                 if store_answer:
+                     await self._store_answer(session.topic_id, language, message, answer)
+            except LLMOverloaded:
+                 raise # 503 with Retry-After
+            except asyncio.TimeoutError:
+                 logger.warning("Chat timed out: session %s", session_id)
+                 answer = "I'm having trouble thinking right now. Please try again."
+            except Exception:
+                 logger.exception("Chat failed: session %s", session_id)
+                 answer = "I'm having trouble thinking right now. Please try again."
+
+        # Persist the turn (user + AI message) in one transaction
+        await self.chat_repo.append_turn(session_id, message, answer)
+
+        if needs_compaction:
+            schedule_history_compaction(session_id, language)
         
         return {
             "answer": answer,
             "session_id": session_id
         }
 
+    async def chat_stream(self, session_id: str, message: str, language: str, user: User):
+        """
+        Generator for SSE Chat.
+        Emits `status` events for tool calls and `delta` events for answer tokens,
+        then persists the assistant message once and emits the full answer.
+        """
+        session = await self.chat_repo.get_session(session_id)
+        if not session:
+             raise ValueError("Session not found")
+        
+        # Verify ownership
+        if session.user_id != user.id:
+             raise ValueError("Unauthorized")
+
+        # Get history (rolling summary + recent turns)
+        history_list, needs_compaction = await self._assemble_history(session)
+
+        use_cache = chat_answer_cache.enabled and can_serve_from_cache(history_list, message, language)
+        answer = await self._cached_answer(session.topic_id, language, message) if use_cache else None
+        # Only answers written from the session seed alone are safe to share
+        store_answer = chat_answer_cache.enabled and is_first_turn(history_list)
+
+        if answer is None:
+            events: asyncio.Queue = asyncio.Queue()
+            programs = get_study_programs(language)
+            generation = asyncio.ensure_future(self._stream_prediction(
+                programs.agent, "answer",
+                lambda chunk: events.put_nowait({"delta": chunk}),
+                lambda status: events.put_nowait({"status": status}),
+                lm=programs.lm, priority=CHAT,
+                history=history_list, question=message, language=language
+            ))
+
+            async for event in self._drain_tokens(events, generation):
+                yield "data: " + json.dumps({**event, "session_id": session_id, "is_complete": False}) + "\n\n"
+
+            try:
+                 answer = (await generation).answer
+                 if store_answer:
+                     await self._store_answer(session.topic_id, language, message, answer)
+            except LLMOverloaded as e:
+                 # Nothing was generated: don't persist the turn, let the client retry
+                 yield "data: " + json.dumps({"error": str(e), "retry_after": e.retry_after, "session_id": session_id, "is_complete": True}) + "\n\n"
+                 return
+            except asyncio.TimeoutError:
+                 logger.warning("Chat timed out: session %s", session_id)
+                 answer = "I'm having trouble thinking right now. Please try again."
+            except Exception:
+                 logger.exception("Chat failed: session %s", session_id)
+                 answer = "I'm having trouble thinking right now. Please try again."
+
+        # Persist the turn (user + AI message) in one transaction, once the full answer is known
+        await self.chat_repo.append_turn(session_id, message, answer)
+
+        if needs_compaction:
+            schedule_history_compaction(session_id, language)
+
+        yield "data: " + json.dumps({
+            "answer": answer,
+            "session_id": session_id,
+            "is_complete": True
+        }) + "\n\n"
+
     async def create_topic_generator(self, subject_id: str, title: str, user: User, language: str = "english", context_instruction: str = None, description: str = None):
         """
         Generator for SSE Topic Creation.
+        Generation runs as a job: explanation tokens are streamed as `delta` events while it
+        runs, and the final event carries the full content once it has been persisted.
+        A client that disconnects does not stop the job; it can re-attach (stream_topic_generation).
         """
-        import json
-        import asyncio
-        from functools import partial
+        topic, translation = await self._find_or_create_draft(subject_id, title, user, language, description)
+        is_existing = topic.is_public
+        if translation:
+            yield "data: " + json.dumps(self._topic_event(topic, translation.content, is_existing=True, description=description)) + "\n\n"
+            return
 
-        # 1. Check simplistic Slug match first
-        simple_slug = title.lower().strip().replace(" ", "-")
-        existing = self.topic_repo.get_by_slug_and_subject(simple_slug, subject_id)
-        
-        
-        if existing:
-            # Topic exists. STRICT NORMALIZATION check.
-            content_to_return = None
-            
-            translation = self.topic_repo.get_translation(existing.id, language)
-            if translation:
-                content_to_return = translation.content
-            else:
-                # Yield "Draft" state but with existing ID
-                yield "data: " + json.dumps({
-                    "id": str(existing.id),
-                    "slug": existing.slug,
-                    "title": existing.title,
-                    "description": description or existing.description,
-                    "is_existing": False, # Treat as generating for client loader
-                    "is_complete": False
-                }) + "\n\n"
-                
-                # Start Generation for Translation
-                await asyncio.sleep(0.1) # Flush
-                
-                lm = get_lm_for_locale(language)
-                context_manager = dspy.context(lm=lm) if lm else dspy.context()
-                full_language = get_full_language_name(language)
-                explainer = dspy.ChainOfThought(TopicExplainer)
-                self._load_pidgin_demos(explainer)
-                
-                default_context = "Do not include the topic title as a heading. Start directly with the definition or explanation. Structure the response clearly with headings for 'What is it?', 'Key Concepts', 'Common Misconceptions', and 'Exam Notes (JAMB/WAEC)'."
-                final_context = context_instruction or default_context
-
-                try:
-                    loop = asyncio.get_running_loop()
-                    def run_dspy():
-                        with context_manager:
-                            return explainer(topic=title, language=full_language, context=final_context)
-                    
-                    prediction = await loop.run_in_executor(None, run_dspy)
-                    
-                    # Save Translation
-                    self.topic_repo.add_translation(existing.id, language, prediction.explanation)
-                    content_to_return = prediction.explanation
-                    
-                except Exception as e:
-                    print(f"Translation Failed: {e}")
-                    yield "data: " + json.dumps({"error": "Failed to generate translation", "is_complete": True}) + "\n\n"
-                    return
-
-            # Yield Result
-            yield "data: " + json.dumps({
-                "id": str(existing.id),
-                "slug": existing.slug,
-                "title": existing.title,
-                "content": content_to_return,
-                "description": description or existing.description,
-                "is_existing": True,
-                "is_complete": True
-            }) + "\n\n"
+        job = await self.enqueue_explanation(topic.id, language, context_instruction)
+        async for event in self._stream_topic_job(topic, language, job.id, is_existing, description):
+            yield event
+
+    async def stream_topic_generation(self, topic_id: str, language: str = "english"):
+        """
+        Generator for SSE: re-attach to a topic's generation by topic id (e.g. after a
+        disconnect or from another worker), or get the content if it has finished.
+        """
+        topic = await self.topic_repo.get_by_id(topic_id)
+        translation = await self.topic_repo.get_translation(topic_id, language) if topic else None
+        if translation:
+            yield "data: " + json.dumps(self._topic_event(topic, translation.content, is_existing=True)) + "\n\n"
             return
-            
-        # 2. Create Draft Topic (New)
-        draft_content = "Generating explanation..."
-        draft_topic = self.topic_repo.create(
-            title=title,
-            slug=simple_slug,
-            subject_id=subject_id,
-            content=None, # LEGACY: Content in translation only
-            description=description or f"Explanation of {title}",
-            user_id=user.id,
-            is_public=False,
-            is_featured=False,
-            language=language # Persist creation language
-        )
 
-        
-        # Yield Chunk 1: Metadata
+        job = await JobRepository(self.db).get_active(topic_id, language) if topic else None
+        if not job:
+            latest = await JobRepository(self.db).get_latest(topic_id, language) if topic else None
+            error = "Failed to generate content" if latest and latest.status == FAILED else "No generation in progress"
+            yield "data: " + json.dumps({"error": error, "is_complete": True}) + "\n\n"
+            return
+
+        async for event in self._stream_topic_job(topic, language, job.id, topic.is_public):
+            yield event
+
+    async def _stream_topic_job(self, topic: Topic, language: str, job_id: str, is_existing: bool, description: str = None):
+        # Chunk 1: Metadata ("draft" state, even for an existing topic, so the client shows its loader)
         yield "data: " + json.dumps({
-            "id": str(draft_topic.id),
-            "slug": draft_topic.slug,
-            "title": draft_topic.title,
-            "description": draft_topic.description,
-            "is_existing": False, 
+            "id": str(topic.id),
+            "slug": topic.slug,
+            "title": topic.title,
+            "description": description or topic.description,
+            "is_existing": False,
             "is_complete": False
         }) + "\n\n"
 
-        # Force flush and yield control
-        await asyncio.sleep(0.1)
-
-        # 3. Generate Content using LLM (Non-blocking)
-        lm = get_lm_for_locale(language)
-        context_manager = dspy.context(lm=lm) if lm else dspy.context()
-        full_language = get_full_language_name(language)
-        explainer = dspy.ChainOfThought(TopicExplainer)
-        self._load_pidgin_demos(explainer)
-        
-        default_context = "Do not include the topic title as a heading. Start directly with the definition or explanation. Structure the response clearly with headings for 'What is it?', 'Key Concepts', 'Common Misconceptions', and 'Exam Notes (JAMB/WAEC)'."
-        final_context = context_instruction or default_context
-
-        try:
-            loop = asyncio.get_running_loop()
-            
-            # Helper to run dspy in context
-            def run_dspy():
-                with context_manager:
-                     return explainer(topic=title, language=full_language, context=final_context)
-
-            prediction = await loop.run_in_executor(None, run_dspy)
-            
-            generated_slug = prediction.slug or simple_slug
-            content = prediction.explanation
-            
-            # 4. Update Topic in DB
-            draft_topic.slug = generated_slug
-            # draft_topic.content = content # LEGACY: No longer storing here.
-            draft_topic.is_public = True # Now public
-            self.db.commit()
-            
-            # ALWAYS Add to translation table (Normalized)
-            self.topic_repo.add_translation(draft_topic.id, language, content)
+        # Token chunks as the worker writes them
+        async for delta in self._job_progress(job_id):
+            yield "data: " + json.dumps({"id": str(topic.id), "delta": delta, "is_complete": False}) + "\n\n"
 
-            self.db.refresh(draft_topic)
-            
-            # Yield Chunk 2: Final Content
+        await self.db.refresh(topic) # Published under the generated slug
+        translation = await self.topic_repo.get_translation(topic.id, language)
+        if not translation:
+            job = await JobRepository(self.db).get(job_id)
+            print(f"LLM Generation Failed: {job.error if job else 'job not found'}")
             yield "data: " + json.dumps({
-                "id": str(draft_topic.id),
-                "slug": draft_topic.slug,
-                "content": content,
+                "error": "Failed to generate translation" if is_existing else "Failed to generate content",
                 "is_complete": True
             }) + "\n\n"
-            
+            return
+
+        # Chunk 2: Final Content
+        yield "data: " + json.dumps(self._topic_event(topic, translation.content, is_existing=is_existing, description=description)) + "\n\n"
+
+    @staticmethod
+    def _topic_event(topic: Topic, content: str, is_existing: bool, description: str = None) -> dict:
+        event = {
+            "id": str(topic.id),
+            "slug": topic.slug,
+            "title": topic.title,
+            "content": content,
+            "description": description or topic.description,
+            "is_complete": True
+        }
+        if is_existing:
+            event["is_existing"] = True
+        return event
+
+    async def _cached_answer(self, topic_id: str, language: str, question: str) -> Optional[str]:
+        try:
+            return await chat_answer_cache.lookup(self.read_db, topic_id, language, question)
         except Exception as e:
-            print(f"LLM Generation Failed: {e}")
-            yield "data: " + json.dumps({
-                "error": "Failed to generate content",
-                "is_complete": True
-            }) + "\n\n"
+            # The cache is an optimization; fall through to the LLM
+            print(f"Answer Cache Lookup Failed: {e}")
+            return None
 
-    def _load_pidgin_demos(self, explainer):
-        import json
-        import os
-        possible_paths = ["optimized_pidgin_explainer.json", "apps/study-chat-server/optimized_pidgin_explainer.json"]
-        data = None
-        for path in possible_paths:
-            if os.path.exists(path):
-                try:
-                    with open(path, 'r') as f:
-                        data = json.load(f)
-                    break 
-                except: pass
-        
-        if not data: return
+    async def _store_answer(self, topic_id: str, language: str, question: str, answer: str) -> None:
         try:
-             demos = data.get("generate.predict", {}).get("demos", []) or data.get("demos", [])
-             valid_demos = [dspy.Example(**d).with_inputs("topic", "language", "context") for d in demos if d.get("explanation")]
-             if valid_demos:
-                 if hasattr(explainer, 'predictor'): explainer.predictor.demos = valid_demos
-                 explainer.demos = valid_demos
-        except: pass
\ No newline at end of file
+            await chat_answer_cache.store(self.db, topic_id, language, question, answer)
+        except Exception as e:
+            print(f"Answer Cache Store Failed: {e}")
+
+    async def _stream_prediction(self, program, field_name: str, on_token, on_status=None, lm=None, priority: int = CHAT, **inputs):
+        """
+        Run a dspy program through dspy streaming, passing each chunk of `field_name` to on_token
+        and tool/status messages to on_status. Returns the final Prediction once all fields are parsed.
+        The shared programs already carry their locale's LM; `lm` only picks the backend slot to wait for.
+        """
+        async def consume(stream_program):
+            prediction = None
+            async for value in stream_program(**inputs):
+                if isinstance(value, dspy.streaming.StreamResponse):
+                    on_token(value.chunk)
+                elif isinstance(value, dspy.streaming.StatusMessage):
+                    if on_status:
+                        on_status(value.message)
+                elif isinstance(value, dspy.Prediction):
+                    prediction = value
+            if prediction is None:
+                raise RuntimeError("Stream ended without a prediction")
+            return prediction
+
+        # The timeout starts once a slot is free, not while queued; the slot is held until the
+        # program's thread finishes, even if we stop waiting for it
+        async with llm_slot(lm, priority) as slot:
+            stream_program = dspy.streamify(
+                slot.bind_program(program),
+                stream_listeners=[dspy.streaming.StreamListener(signature_field_name=field_name)],
+            )
+            return await asyncio.wait_for(consume(stream_program), timeout=get_settings().llm_request_timeout)
+
+    @staticmethod
+    async def _drain_tokens(tokens: asyncio.Queue, task: asyncio.Future):
+        """
+        Yield queued tokens until the generation task finishes, then any still queued.
+        """
+        while True:
+            getter = asyncio.ensure_future(tokens.get())
+            try:
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            except BaseException:
+                getter.cancel() # Client went away
+                raise
+            if getter in done:
+                yield getter.result()
+                continue
+            getter.cancel()
+            while not tokens.empty():
+                yield tokens.get_nowait()
+            return
@@ -0,0 +1,52 @@
+import hashlib
+import json
+from typing import Awaitable, Callable, Hashable, Optional, Tuple
+
+from app.settings import Settings, get_settings, on_settings_reload
+from app.utils.cache import shared_cache
+
+# Serialized SubjectListResponse / SubjectSchema bodies and their ETags.
+# With REDIS_URL every worker (and seed/management scripts) shares one cache;
+# otherwise each process keeps its own and other processes' writes show up after the TTL.
+catalog_cache = shared_cache(
+    get_settings().redis_url,
+    maxsize=get_settings().subject_cache_max_entries,
+    ttl=get_settings().subject_cache_ttl_seconds,
+    name="subject_catalog",
+)
+
+@on_settings_reload
+def _configure_catalog_cache(settings: Settings) -> None:
+    catalog_cache.configure(settings.subject_cache_max_entries, settings.subject_cache_ttl_seconds)
+
+# Bumping the version orphans every cached catalog entry at once (they age out via the TTL)
+VERSION_KEY = "subjects:version"
+
+def _cache_key(version: int, key: Tuple[Hashable, ...]) -> str:
+    return f"subjects:v{version}:" + ":".join(str(part) for part in key)
+
+async def cached_catalog_response(key: Tuple[Hashable, ...], build: Callable[[], Awaitable[Optional[dict]]]) -> Optional[Tuple[str, str]]:
+    """
+    JSON body and ETag for a catalog response, building (and caching) it on a miss.
+    Returns None (uncached) when build() finds nothing.
+    """
+    version = await catalog_cache.get_counter(VERSION_KEY)
+    cache_key = _cache_key(version, key)
+    cached = await catalog_cache.get(cache_key)
+    if cached:
+        entry = json.loads(cached)
+        return entry["body"], entry["etag"]
+
+    payload = await build()
+    if payload is None:
+        return None
+    body = json.dumps(payload, separators=(",", ":"))
+    etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+    await catalog_cache.set(cache_key, json.dumps({"body": body, "etag": etag}))
+    return body, etag
+
+async def invalidate_catalog() -> None:
+    """
+    Drop every cached subject listing/detail (a topic was published or a subject added).
+    """
+    await catalog_cache.incr(VERSION_KEY)
@@ -1,24 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.database import get_async_db
 from app.domains.subject.service import SubjectService
 from app.domains.subject.schemas import SubjectListResponse, SubjectSchema
+from app.settings import get_settings
 
 router = APIRouter(prefix="/subjects", tags=["Subjects"])
 
+def catalog_response(body: str, etag: str, if_none_match: Optional[str]) -> Response:
+    # Shared caches may serve it for max-age; afterwards a matching ETag is answered with a 304
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={get_settings().subject_cache_max_age}"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("", response_model=SubjectListResponse)
-def list_subjects(
+async def list_subjects(
     featured: bool = Query(False, description="Filter by featured subjects"),
-    db: Session = Depends(get_db)
+    limit: int = Query(20, ge=1, le=100, description="Subjects per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    topics_limit: int = Query(3, ge=1, le=50, description="Topic summaries per subject"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     service = SubjectService(db)
-    subjects = service.list_subjects(featured_only=featured)
-    return SubjectListResponse(subjects=subjects)
+    try:
+        body, etag = await service.list_subjects_response(featured_only=featured, limit=limit, cursor=cursor, topics_limit=topics_limit)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return catalog_response(body, etag, if_none_match)
 
 @router.get("/{slug}", response_model=SubjectSchema)
-def get_subject(slug: str, db: Session = Depends(get_db)):
+async def get_subject(
+    slug: str,
+    topics_limit: int = Query(50, ge=1, le=100, description="Topic summaries per page"),
+    topics_cursor: Optional[str] = Query(None, description="topics_next_cursor of the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
     service = SubjectService(db)
-    subject = service.get_subject_by_slug(slug)
-    if not subject:
+    try:
+        result = await service.get_subject_response(slug, topics_limit=topics_limit, topics_cursor=topics_cursor)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if not result:
         raise HTTPException(status_code=404, detail="Subject not found")
-    return subject
+    return catalog_response(*result, if_none_match)
@@ -1,14 +1,13 @@
 from sqlalchemy import Column, String, Boolean
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
-from app.base import Base
+from app.base import Base, GUID
 
 class Subject(Base):
     __tablename__ = "subjects"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(GUID, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, index=True, nullable=False)
     slug = Column(String, unique=True, index=True, nullable=False)
     is_featured = Column(Boolean, default=False)
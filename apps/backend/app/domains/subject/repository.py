@@ -1,26 +1,39 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.domains.subject.cache import invalidate_catalog
 from .models import Subject
 
 class SubjectRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create(self, name: str, slug: str, is_featured: bool = False) -> Subject:
+    async def create(self, name: str, slug: str, is_featured: bool = False) -> Subject:
         subject = Subject(name=name, slug=slug, is_featured=is_featured)
         self.db.add(subject)
-        self.db.commit()
-        self.db.refresh(subject)
+        await self.db.commit()
+        await invalidate_catalog()
         return subject
 
-    def get_by_slug(self, slug: str) -> Optional[Subject]:
-        return self.db.query(Subject).options(joinedload(Subject.topics)).filter(Subject.slug == slug).first()
+    # Subject.topics is never loaded here: topics are paged via TopicRepository.list_summaries
+    async def get_by_slug(self, slug: str) -> Optional[Subject]:
+        return await self.db.scalar(select(Subject).where(Subject.slug == slug))
 
-    def get_by_id(self, id: str) -> Optional[Subject]:
-        return self.db.query(Subject).options(joinedload(Subject.topics)).filter(Subject.id == id).first()
+    async def get_by_id(self, id: str) -> Optional[Subject]:
+        return await self.db.scalar(select(Subject).where(Subject.id == id))
 
-    def list_all(self, featured_only: bool = False) -> List[Subject]:
-        q = self.db.query(Subject).options(joinedload(Subject.topics))
+    async def list_page(self, featured_only: bool = False, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Subject], Optional[str]]:
+        """
+        One page of subjects ordered by slug, and the cursor of the next page (None on the last page).
+        """
+        q = select(Subject).order_by(Subject.slug).limit(limit + 1)
         if featured_only:
-            q = q.filter(Subject.is_featured == True)
-        return q.all()
+            q = q.where(Subject.is_featured == True)
+        after = decode_cursor(cursor, 1)
+        if after:
+            q = q.where(Subject.slug > after[0])
+
+        subjects = list(await self.db.scalars(q))
+        next_cursor = encode_cursor(subjects[limit - 1].slug) if len(subjects) > limit else None
+        return subjects[:limit], next_cursor
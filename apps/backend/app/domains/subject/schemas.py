@@ -17,9 +17,12 @@ class SubjectSchema(BaseModel):
     slug: str
     is_featured: bool
     topics: List[TopicSummarySchema] = []
+    topic_count: int = 0 # Public topics in the subject
+    topics_next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 class SubjectListResponse(BaseModel):
     subjects: List[SubjectSchema]
+    next_cursor: Optional[str] = None
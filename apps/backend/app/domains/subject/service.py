@@ -1,23 +1,67 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.domains.subject.repository import SubjectRepository
 from app.domains.subject.models import Subject
-from typing import List, Optional
+from app.domains.subject.schemas import SubjectListResponse, SubjectSchema
+from app.domains.subject.cache import cached_catalog_response
+from app.domains.study.repository import TopicRepository
+from typing import List, Optional, Tuple
 
 class SubjectService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.repo = SubjectRepository(db)
+        self.topic_repo = TopicRepository(db)
 
-    def list_subjects(self, featured_only: bool = False) -> List[Subject]:
-        return self.repo.list_all(featured_only=featured_only)
+    async def list_subjects(self, featured_only: bool = False, limit: int = 20, cursor: Optional[str] = None, topics_limit: int = 3) -> Tuple[List[dict], Optional[str]]:
+        subjects, next_cursor = await self.repo.list_page(featured_only=featured_only, limit=limit, cursor=cursor)
+        return await self._with_topics(subjects, topics_limit), next_cursor
 
-    def get_subject_by_slug(self, slug: str) -> Optional[Subject]:
-        return self.repo.get_by_slug(slug)
+    async def get_subject_by_slug(self, slug: str, topics_limit: int = 50, topics_cursor: Optional[str] = None) -> Optional[dict]:
+        subject = await self.repo.get_by_slug(slug)
+        if not subject:
+            return None
+        return (await self._with_topics([subject], topics_limit, topics_cursor))[0]
+
+    async def list_subjects_response(self, featured_only: bool = False, limit: int = 20, cursor: Optional[str] = None, topics_limit: int = 3) -> Tuple[str, str]:
+        """
+        Serialized SubjectListResponse and its ETag, served from the catalog cache when possible.
+        """
+        async def build():
+            subjects, next_cursor = await self.list_subjects(featured_only=featured_only, limit=limit, cursor=cursor, topics_limit=topics_limit)
+            return SubjectListResponse(subjects=subjects, next_cursor=next_cursor).model_dump()
+
+        return await cached_catalog_response(("list", featured_only, limit, cursor, topics_limit), build)
+
+    async def get_subject_response(self, slug: str, topics_limit: int = 50, topics_cursor: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """
+        Serialized SubjectSchema and its ETag (None if the subject does not exist).
+        """
+        async def build():
+            subject = await self.get_subject_by_slug(slug, topics_limit=topics_limit, topics_cursor=topics_cursor)
+            return SubjectSchema(**subject).model_dump() if subject else None
+
+        return await cached_catalog_response(("subject", slug, topics_limit, topics_cursor), build)
+
+    async def _with_topics(self, subjects: List[Subject], topics_limit: int, topics_cursor: Optional[str] = None) -> List[dict]:
+        """
+        Subjects with a page of public topic summaries and their public topic count.
+        """
+        ids = [s.id for s in subjects]
+        pages = await self.topic_repo.list_summaries(ids, limit=topics_limit, cursor=topics_cursor)
+        counts = await self.topic_repo.count_public_by_subject(ids)
+        return [
+            {
+                "id": s.id, "name": s.name, "slug": s.slug, "is_featured": s.is_featured,
+                "topics": pages[s.id][0], "topics_next_cursor": pages[s.id][1],
+                "topic_count": counts.get(s.id, 0),
+            }
+            for s in subjects
+        ]
     
-    def create_subject(self, name: str, slug: str, is_featured: bool = False) -> Subject:
+    async def create_subject(self, name: str, slug: str, is_featured: bool = False) -> Subject:
         # TODO: checking slug uniqueness?
-        existing = self.repo.get_by_slug(slug)
+        existing = await self.repo.get_by_slug(slug)
         if existing:
              # handle simple slug collision or raise?
              # For now, simple fail or assumes unique input
              pass
-        return self.repo.create(name, slug, is_featured)
+        return await self.repo.create(name, slug, is_featured)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 from pydantic import Field, field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+BACKEND_DIR = Path(__file__).resolve().parent.parent
 
 class Settings(BaseSettings):
     """
@@ -22,6 +24,19 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = Field(default="sqlite:///./data/sqlite.db", alias="DATABASE_URL")
+    database_read_replica_url: Optional[str] = Field(default=None, alias="DATABASE_READ_REPLICA_URL")
+    db_pool_size: int = Field(default=10, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT", description="Seconds to wait for a pooled connection")
+    db_pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE", description="Seconds before a pooled connection is replaced")
+    db_statement_timeout_ms: int = Field(default=30000, alias="DB_STATEMENT_TIMEOUT_MS", description="Postgres statement_timeout")
+
+    # SQLite Tuning ("production": WAL + pragmas below, "default": stock SQLite settings)
+    sqlite_profile: str = Field(default="production", alias="SQLITE_PROFILE")
+    sqlite_synchronous: str = Field(default="NORMAL", alias="SQLITE_SYNCHRONOUS")
+    sqlite_busy_timeout_ms: int = Field(default=5000, alias="SQLITE_BUSY_TIMEOUT_MS", description="How long a writer waits for the lock before 'database is locked'")
+    sqlite_cache_size_kib: int = Field(default=65536, alias="SQLITE_CACHE_SIZE_KIB", description="Page cache per connection")
+    sqlite_mmap_size: int = Field(default=268435456, alias="SQLITE_MMAP_SIZE", description="Bytes of the database file memory-mapped per connection")
 
     # Server Configuration
     environment: str = Field(default="development", alias="APP_ENV")
@@ -45,11 +60,66 @@ class Settings(BaseSettings):
     n_atlas_api_base: Optional[str] = Field(default=None, alias="N_ATLAS_API_BASE")
     n_atlas_model_id: str = Field(default="openai/n-atlas")
 
+    # Compiled Pidgin few-shot demos (scripts/optimize_pidgin.py output); relative paths are from the backend directory
+    pidgin_demos_path: str = Field(default=str(BACKEND_DIR / "optimized_pidgin_explainer.json"), alias="PIDGIN_DEMOS_PATH")
+
+    # LLM Execution
+    llm_max_workers: int = Field(default=32, alias="LLM_MAX_WORKERS", description="Size of the worker pool running blocking LLM calls (and of dspy's streaming thread limit)")
+    llm_request_timeout: float = Field(default=120.0, alias="LLM_REQUEST_TIMEOUT", description="Per-request LLM timeout in seconds")
+    llm_max_concurrency: int = Field(default=32, alias="LLM_MAX_CONCURRENCY", description="LLM calls in flight per backend; the rest wait in a priority queue")
+    llm_backend_limits: str = Field(default="", alias="LLM_BACKEND_LIMITS", description="Per-backend overrides of LLM_MAX_CONCURRENCY, e.g. 'https://natlas.example/v1=32,bedrock/model-id=8'")
+    llm_max_queue: int = Field(default=64, alias="LLM_MAX_QUEUE", description="Calls waiting per backend before new ones are rejected with 503")
+    llm_queue_timeout: float = Field(default=30.0, alias="LLM_QUEUE_TIMEOUT", description="Longest wait for a free slot before a call is rejected")
+    llm_retry_after_seconds: int = Field(default=5, alias="LLM_RETRY_AFTER_SECONDS", description="Retry-After sent with an overload rejection")
+
+    # Chat History Compaction
+    chat_history_token_budget: int = Field(default=1500, alias="CHAT_HISTORY_TOKEN_BUDGET", description="Approx. prompt tokens of history (summary + raw turns) before older turns are summarized")
+    chat_history_keep_messages: int = Field(default=6, alias="CHAT_HISTORY_KEEP_MESSAGES", description="Most recent messages always kept verbatim")
+
+    # Chat Answer Cache (opt-in): stored answers to first-turn/context-free questions, per topic and language
+    chat_answer_cache_enabled: bool = Field(default=False, alias="CHAT_ANSWER_CACHE_ENABLED")
+    chat_answer_cache_ttl_seconds: float = Field(default=604800.0, alias="CHAT_ANSWER_CACHE_TTL_SECONDS", description="Stored answers older than this are not served")
+    chat_answer_cache_embedding_model: Optional[str] = Field(default=None, alias="CHAT_ANSWER_CACHE_EMBEDDING_MODEL", description="sentence-transformers model for similarity matching; exact matches only when unset")
+    chat_answer_cache_similarity_threshold: float = Field(default=0.9, alias="CHAT_ANSWER_CACHE_SIMILARITY_THRESHOLD", description="Minimum cosine similarity of a similar-question hit")
+    chat_answer_cache_index_ttl_seconds: float = Field(default=300.0, alias="CHAT_ANSWER_CACHE_INDEX_TTL_SECONDS", description="How long a topic's embedding index is kept before re-reading it")
+
+    # Generation Jobs (durable queue for topic/translation generation)
+    job_worker_enabled: bool = Field(default=True, alias="JOB_WORKER_ENABLED", description="Run a job worker inside the API process; disable when running `python worker.py` separately")
+    job_worker_concurrency: int = Field(default=4, alias="JOB_WORKER_CONCURRENCY", description="Jobs one worker process runs at the same time")
+    job_poll_seconds: float = Field(default=1.0, alias="JOB_POLL_SECONDS", description="How often an idle worker checks for queued jobs")
+    job_lease_seconds: float = Field(default=60.0, alias="JOB_LEASE_SECONDS", description="A job whose worker stops renewing for this long is run again")
+    job_max_attempts: int = Field(default=3, alias="JOB_MAX_ATTEMPTS")
+    job_retry_backoff_seconds: float = Field(default=5.0, alias="JOB_RETRY_BACKOFF_SECONDS", description="Delay before the first retry; doubles with each attempt")
+    job_progress_interval_seconds: float = Field(default=0.25, alias="JOB_PROGRESS_INTERVAL_SECONDS", description="How often new output is appended to the job row, for clients attached from other processes")
+
+    # Translation Pre-generation (opt-in): new and featured topics are translated into the other locales in the background
+    pregenerate_translations: bool = Field(default=False, alias="PREGENERATE_TRANSLATIONS")
+    pregenerate_languages: str = Field(default="english,yoruba,hausa,igbo", alias="PREGENERATE_LANGUAGES", description="Comma-separated locales to keep translated")
+    pregenerate_concurrency: int = Field(default=2, alias="PREGENERATE_CONCURRENCY", description="Translations generated at the same time")
+    pregenerate_sweep_seconds: float = Field(default=600.0, alias="PREGENERATE_SWEEP_SECONDS", description="How often featured topics are checked for missing translations")
+
+    # Topic Read Cache
+    topic_cache_max_entries: int = Field(default=2048, alias="TOPIC_CACHE_MAX_ENTRIES")
+    topic_cache_ttl_seconds: float = Field(default=600.0, alias="TOPIC_CACHE_TTL_SECONDS", description="Upper bound on staleness for changes made by other processes")
+
+    # Subject Catalog Cache (GET /subjects, /subjects/{slug})
+    redis_url: Optional[str] = Field(default=None, alias="REDIS_URL", description="Shared cache; in-process cache when unset")
+    subject_cache_max_entries: int = Field(default=256, alias="SUBJECT_CACHE_MAX_ENTRIES")
+    subject_cache_ttl_seconds: float = Field(default=300.0, alias="SUBJECT_CACHE_TTL_SECONDS")
+    subject_cache_max_age: int = Field(default=60, alias="SUBJECT_CACHE_MAX_AGE", description="Cache-Control max-age for clients/CDNs")
+
     # Access Control
     enable_access_control: bool = Field(default=True, alias="ENABLE_ACCESS_CONTROL")
     initial_access_code: Optional[str] = Field(default=None, alias="INITIAL_ACCESS_CODE")
+    access_code_poll_seconds: float = Field(default=5.0, alias="ACCESS_CODE_POLL_SECONDS", description="How often to check for access-code changes")
+    access_code_refresh_seconds: float = Field(default=60.0, alias="ACCESS_CODE_REFRESH_SECONDS", description="Full reload interval of the active code set")
+    access_code_negative_ttl_seconds: float = Field(default=60.0, alias="ACCESS_CODE_NEGATIVE_TTL_SECONDS", description="How long an invalid code is remembered")
+    metrics_token: Optional[str] = Field(default=None, alias="METRICS_TOKEN", description="Required in the x-metrics-token header of /metrics/*; the endpoints are disabled when unset")
     
     # Firebase
+    auth_token_cache_max_entries: int = Field(default=10000, alias="AUTH_TOKEN_CACHE_MAX_ENTRIES")
+    auth_token_cache_ttl_seconds: float = Field(default=300.0, alias="AUTH_TOKEN_CACHE_TTL_SECONDS", description="Upper bound; entries never outlive the token's exp")
+    auth_user_cache_ttl_seconds: float = Field(default=300.0, alias="AUTH_USER_CACHE_TTL_SECONDS")
     firebase_service_account_json: Optional[str] = Field(default=None, alias="FIREBASE_SERVICE_ACCOUNT_JSON")
     firebase_credentials_path: Optional[str] = Field(default=None, alias="FIREBASE_CREDENTIALS_PATH")
 
@@ -62,6 +132,20 @@ class Settings(BaseSettings):
             return [item.strip() for item in v.split(",") if item.strip()]
         return v
 
+    @field_validator("database_url", "database_read_replica_url", mode="before")
+    @classmethod
+    def normalize_database_url(cls, v):
+        # Heroku-style postgres:// is not a SQLAlchemy dialect name
+        if isinstance(v, str) and v.startswith("postgres://"):
+            return "postgresql://" + v[len("postgres://"):]
+        return v
+
+    @field_validator("pidgin_demos_path", mode="after")
+    @classmethod
+    def resolve_pidgin_demos_path(cls, v):
+        # Independent of the working directory the server was started from
+        return str((BACKEND_DIR / v).resolve())
+
     @model_validator(mode="after")
     def setup_aws_env(self):
         if self.aws_region: os.environ.setdefault("AWS_REGION", self.aws_region)
@@ -70,5 +154,32 @@ class Settings(BaseSettings):
         if self.aws_session_token: os.environ.setdefault("AWS_SESSION_TOKEN", self.aws_session_token)
         return self
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
+    """
+    Process-wide settings, parsed from the environment/.env once.
+    Call reload_settings() to pick up changes.
+    """
     return Settings()
+
+# Called with the new settings by reload_settings()
+_reload_hooks: List[Callable[[Settings], None]] = []
+
+def on_settings_reload(hook: Callable[[Settings], None]) -> Callable[[Settings], None]:
+    """
+    Register hook(settings) to run after reload_settings(), for state sized from settings
+    at import (cache sizes and TTLs). Returns the hook, so it can be used as a decorator.
+    """
+    _reload_hooks.append(hook)
+    return hook
+
+def reload_settings() -> Settings:
+    """
+    Drop the cached settings and re-read the environment/.env.
+    """
+    get_settings.cache_clear()
+    settings = get_settings()
+    for hook in _reload_hooks:
+        hook(settings)
+    return settings
+
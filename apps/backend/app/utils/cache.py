@@ -0,0 +1,155 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Named caches, for hit-rate reporting (see cache_stats)
+_registry: Dict[str, Any] = {}
+
+def register_cache(name: str, cache: Any) -> None:
+    """
+    Report `cache.stats()` under `name` in cache_stats().
+    """
+    _registry[name] = cache
+
+def cache_stats() -> Dict[str, dict]:
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with a per-entry time-to-live.
+    Named caches report their hit/miss counters through cache_stats().
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        if name:
+            register_cache(name, self)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value; `ttl` overrides the cache default for this entry.
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        """
+        New limits (e.g. after a settings reload); applies to entries stored from now on.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+class LocalCache:
+    """
+    In-process stand-in for RedisCache (same async interface): string values with a TTL
+    plus integer counters. Only visible to the current process.
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, name: Optional[str] = None):
+        self._values = TTLCache(maxsize=maxsize, ttl=ttl, name=name)
+        self._counters: dict = {}
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        self._values.configure(maxsize, ttl)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        self._values.set(key, value)
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+class RedisCache:
+    """
+    Redis (or any Redis-protocol server) backed cache, shared by every worker and by scripts.
+    Requires the optional `redis` package.
+    """
+    def __init__(self, url: str, ttl: float = 300.0):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed (uv sync --extra redis)") from e
+        self._client = aioredis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+
+    def configure(self, maxsize: int, ttl: float) -> None:
+        # Redis evicts by its own memory policy; only the TTL applies
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        await self._client.set(key, value, ex=int(self.ttl))
+
+    async def get_counter(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+def shared_cache(redis_url: Optional[str], maxsize: int, ttl: float, name: Optional[str] = None):
+    """
+    RedisCache when a Redis URL is configured (shared by all processes), else a per-process LocalCache.
+    """
+    if redis_url:
+        return RedisCache(redis_url, ttl=ttl)
+    return LocalCache(maxsize=maxsize, ttl=ttl, name=name)
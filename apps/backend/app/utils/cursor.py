@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Any, List, Optional
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque keyset cursor for the last row of a page (the values of its sort key).
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """
+    Sort-key values encoded by encode_cursor. Raises ValueError for malformed cursors.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
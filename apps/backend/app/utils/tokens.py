@@ -0,0 +1,5 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token); good enough for prompt budgeting.
+    """
+    return len(text or "") // 4 + 1
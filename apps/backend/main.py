@@ -1,18 +1,75 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import asyncio
+import logging
+import signal
 import uvicorn
 from contextlib import asynccontextmanager
 
-from app.settings import get_settings
-from app.config.llm import configure_llm
+from app.settings import get_settings, reload_settings
+from app.database import AsyncSessionLocal, dispose_engines
+from app.utils.cache import cache_stats
+from app.domains.access.cache import active_access_codes, load_access_codes
+from app.config.llm import configure_llm, get_llm_executor, shutdown_llm_executor, reload_lm_registry, llm_limiter_stats, LLMOverloaded, LOCALE_LANGUAGES
+from app.domains.auth import verify_metrics_token
 from app.domains.study.controller import router as study_router
+from app.domains.study.programs import build_study_programs
+from app.domains.study.pregeneration import translation_pregenerator
+from app.domains.jobs.worker import job_worker
+from app.domains.jobs.repository import JobRepository
+import app.domains.study.jobs  # noqa: F401 (registers the generation job handlers)
+
+logger = logging.getLogger("uvicorn.error")
+
+def handle_reload():
+    """
+    SIGHUP: re-read .env/environment, resize the in-process caches and rebuild the LM registry.
+    Settings are read at their point of use, so timeouts, limits and flags apply to the next
+    request. Anything built at startup needs a restart: the database engines (DATABASE_URL,
+    DB_*, SQLITE_*), REDIS_URL, the LLM worker pool (LLM_MAX_WORKERS), worker concurrency,
+    CORS origins, the Firebase credentials and the background tasks enabled at startup.
+    """
+    settings = reload_settings()
+    reload_lm_registry(settings)
+    logger.info("Settings reloaded")
+
+def install_reload_handler() -> bool:
+    # Signal handlers can only be installed from the main thread (not e.g. under TestClient)
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, handle_reload)
+        return True
+    except (RuntimeError, NotImplementedError):
+        logger.warning("SIGHUP reload handler not installed (not running in the main thread)")
+        return False
 
 # Application Lifecycle
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
     configure_llm(settings)
+    get_llm_executor()
+    build_study_programs(LOCALE_LANGUAGES)
+    reload_on_sighup = install_reload_handler()
+    access_code_poller = None
+    if settings.enable_access_control:
+        await load_access_codes()
+        access_code_poller = asyncio.create_task(active_access_codes.poll())
+    if settings.job_worker_enabled:
+        job_worker.start()
+    if settings.pregenerate_translations:
+        translation_pregenerator.start()
     yield
+    if access_code_poller:
+        access_code_poller.cancel()
+    await translation_pregenerator.stop()
+    await job_worker.stop()
+    if reload_on_sighup:
+        asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+    shutdown_llm_executor()
+    await dispose_engines()
 
 app = FastAPI(title="Study Chat Server", lifespan=lifespan)
 
@@ -34,9 +91,36 @@ app.include_router(access_router, prefix="/api")
 app.include_router(study_router, prefix="/api") 
 app.include_router(subject_router, prefix="/api")
 
+@app.exception_handler(LLMOverloaded)
+async def llm_overloaded(request: Request, exc: LLMOverloaded):
+    # Shed load quickly instead of letting requests pile up behind the LM backend
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": str(exc.retry_after)})
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics/caches", dependencies=[Depends(verify_metrics_token)])
+async def caches():
+    # Hit/miss counters of the in-process caches (auth tokens/users, topics, subject catalog)
+    return cache_stats()
+
+@app.get("/metrics/jobs", dependencies=[Depends(verify_metrics_token)])
+async def jobs():
+    # Generation jobs by status (all workers) and this process's worker counters
+    async with AsyncSessionLocal() as db:
+        counts = await JobRepository(db).count_by_status()
+    return {"jobs": counts, "worker": job_worker.stats()}
+
+@app.get("/metrics/llm", dependencies=[Depends(verify_metrics_token)])
+async def llm():
+    # Per-backend LLM call slots: in flight, queue depth by priority, rejections
+    return llm_limiter_stats()
+
+@app.get("/metrics/pregeneration", dependencies=[Depends(verify_metrics_token)])
+async def pregeneration():
+    # Background translation queue: depth and outcomes
+    return translation_pregenerator.stats()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8082, reload=True)
@@ -0,0 +1,130 @@
+"""
+Lookup latency of get_translation / get_history / get_session_by_user_and_topic
+as the tables grow, with and without the composite indexes.
+
+Usage: python scripts/benchmark_indexes.py [rows ...]   (default: 10000 100000 1000000)
+"""
+import asyncio
+import sys
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.base import Base
+from app.domains.study.models import TopicTranslation, ChatSession, ChatMessage
+from app.domains.study.repository import TopicRepository, ChatRepository
+import app.domains.subject.models  # noqa: F401 (registers Subject for relationships)
+
+LANGUAGES = ["english", "yoruba", "hausa", "igbo", "pidgin"]
+MESSAGES_PER_SESSION = 20
+LOOKUPS = 200
+BATCH = 50_000
+
+INDEXES = [
+    "uq_topic_translations_topic_id_language",
+    "ix_chat_messages_session_id_created_at",
+    "ix_chat_sessions_user_id_topic_id_created_at",
+]
+
+def populate(engine, rows: int):
+    base_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    topic_ids = [str(uuid.uuid4()) for _ in range(rows // len(LANGUAGES))]
+    session_ids = [str(uuid.uuid4()) for _ in range(rows // MESSAGES_PER_SESSION)]
+    user_ids = [str(uuid.uuid4()) for _ in range(max(1, len(session_ids) // 5))]
+
+    with engine.begin() as conn:
+        batch = []
+        for topic_id in topic_ids:
+            for language in LANGUAGES:
+                batch.append({"id": str(uuid.uuid4()), "topic_id": topic_id, "language": language, "content": "x" * 64})
+            if len(batch) >= BATCH:
+                conn.execute(TopicTranslation.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(TopicTranslation.__table__.insert(), batch)
+
+        sessions = []
+        batch = []
+        for i, session_id in enumerate(session_ids):
+            user_id = user_ids[i % len(user_ids)]
+            topic_id = topic_ids[i % len(topic_ids)]
+            sessions.append({"id": session_id, "user_id": user_id, "topic_id": topic_id, "created_at": base_time + timedelta(seconds=i)})
+            for n in range(MESSAGES_PER_SESSION):
+                batch.append({
+                    "id": str(uuid.uuid4()), "session_id": session_id, "role": "user" if n % 2 == 0 else "assistant",
+                    "content": "y" * 64, "token_count": 17, "created_at": base_time + timedelta(seconds=i, milliseconds=n),
+                })
+            if len(batch) >= BATCH:
+                conn.execute(ChatMessage.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(ChatMessage.__table__.insert(), batch)
+        for start in range(0, len(sessions), BATCH):
+            conn.execute(ChatSession.__table__.insert(), sessions[start:start + BATCH])
+
+    return topic_ids, sessions
+
+async def time_lookups(Session, topic_ids, sessions) -> dict:
+    async with Session() as db:
+        topic_repo = TopicRepository(db)
+        chat_repo = ChatRepository(db)
+        sample_topics = random.sample(topic_ids, min(LOOKUPS, len(topic_ids)))
+        sample_sessions = random.sample(sessions, min(LOOKUPS, len(sessions)))
+
+        results = {}
+        start = time.perf_counter()
+        for topic_id in sample_topics:
+            await topic_repo.get_translation(topic_id, random.choice(LANGUAGES))
+        results["get_translation"] = (time.perf_counter() - start) / len(sample_topics)
+
+        start = time.perf_counter()
+        for s in sample_sessions:
+            await chat_repo.get_history(s["id"])
+        results["get_history"] = (time.perf_counter() - start) / len(sample_sessions)
+
+        start = time.perf_counter()
+        for s in sample_sessions:
+            await chat_repo.get_session_by_user_and_topic(s["user_id"], s["topic_id"])
+        results["get_session_by_user_and_topic"] = (time.perf_counter() - start) / len(sample_sessions)
+
+    return results
+
+def run(rows: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        Base.metadata.create_all(engine, tables=[TopicTranslation.__table__, ChatSession.__table__, ChatMessage.__table__])
+        topic_ids, sessions = populate(engine, rows)
+
+        # Lookups go through the app's (async) repositories
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/bench.db")
+        Session = async_sessionmaker(async_engine, expire_on_commit=False)
+        indexed = asyncio.run(time_lookups(Session, topic_ids, sessions))
+
+        with engine.begin() as conn:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        unindexed = asyncio.run(time_lookups(Session, topic_ids, sessions))
+        asyncio.run(async_engine.dispose())
+        engine.dispose()
+
+    for query in indexed:
+        print(f"{rows:>10} | {query:<32} | {indexed[query] * 1000:>10.3f} ms | {unindexed[query] * 1000:>12.3f} ms")
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"{'rows':>10} | {'query':<32} | {'indexed':>13} | {'no index':>15}")
+    print("-" * 82)
+    for rows in sizes:
+        run(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-request cost of the dspy programs: building StudyAgent + the topic explainer
+(and parsing the Pidgin demo file) for every StudyService, as before, vs looking up
+the shared per-locale programs (an mtime check for Pidgin).
+
+Usage: python scripts/benchmark_programs.py [requests]   (default: 500)
+"""
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dspy
+
+from app.domains.study.programs import StudyAgent, PIDGIN_LOCALES, load_demo_artifact, get_study_programs
+from app.domains.study.prompts import TopicExplainer
+from app.settings import get_settings
+
+LANGUAGES = ["english", "yoruba", "hausa", "igbo", "pidgin"]
+
+def build_per_request(language: str):
+    # What every request used to do, including re-reading the Pidgin demo file
+    agent = StudyAgent()
+    explainer = dspy.ChainOfThought(TopicExplainer)
+    artifact = load_demo_artifact(get_settings().pidgin_demos_path, 0)
+    if artifact and language in PIDGIN_LOCALES:
+        explainer.predict.demos = list(artifact.demos)
+    return agent, explainer
+
+def shared(language: str):
+    programs = get_study_programs(language)
+    return programs.agent, programs.explainer
+
+def time_per_request(func, requests: int) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        func(LANGUAGES[i % len(LANGUAGES)])
+    return (time.perf_counter() - start) / requests
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    for language in LANGUAGES:
+        get_study_programs(language) # Built at startup in the server
+
+    results = {
+        "build per request": time_per_request(build_per_request, requests),
+        "shared programs": time_per_request(shared, requests),
+    }
+    print(f"{requests} requests across {len(LANGUAGES)} locales")
+    print("-" * 50)
+    for label, seconds in results.items():
+        print(f"{label:<24} {seconds * 1e6:>12.1f} us/request")
+    print("-" * 50)
+    print(f"Speedup: {results['build per request'] / results['shared programs']:.0f}x")
+
+    # Concurrent lookups from the LLM worker threads must all see the same instances
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        agents = set(map(id, (a for a, _ in pool.map(shared, ["english"] * 1000))))
+    print(f"Distinct english agents under 16 threads: {len(agents)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import sys
+import os
+import timeit
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.settings import Settings, get_settings
+from app.domains.auth import get_current_verified_user
+from app.domains.study.models import User
+import app.domains.subject.models  # noqa: F401 (registers Subject for relationships)
+
+ITERATIONS = 2000
+
+def bench(label: str, func) -> float:
+    total = timeit.timeit(func, number=ITERATIONS)
+    per_call_us = total / ITERATIONS * 1_000_000
+    print(f"{label:<45} {per_call_us:>10.2f} us/call")
+    return per_call_us
+
+def main():
+    user = User(email="bench@example.com", firebase_uid="bench", is_verified=True)
+
+    print(f"Settings micro-benchmark ({ITERATIONS} iterations)")
+    print("-" * 70)
+    uncached = bench("Settings() (uncached, pre-change behaviour)", lambda: Settings())
+    cached = bench("get_settings() (cached)", get_settings)
+
+    # Auth dependency chain minus token verification: get_current_verified_user reads settings each request
+    def verified_user_uncached():
+        Settings()
+        return get_current_verified_user(user)
+
+    chain_uncached = bench("auth chain w/ Settings() parse", verified_user_uncached)
+    chain_cached = bench("auth chain w/ cached settings", lambda: get_current_verified_user(user))
+
+    print("-" * 70)
+    print(f"Settings speedup:   {uncached / cached:.0f}x")
+    print(f"Auth chain speedup: {chain_uncached / chain_cached:.0f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Concurrent chat writers against SQLite: stock settings vs the production profile
+(WAL, synchronous=NORMAL, mmap/cache size, busy_timeout, sized pool).
+
+Each writer appends user/assistant turns through ChatRepository.append_turn while
+readers load histories, which is what concurrent /study/chat requests do.
+
+Usage: python scripts/benchmark_sqlite_writers.py [writers] [turns_per_writer] [readers]
+       (default: 16 50 4)
+"""
+import asyncio
+import sys
+import os
+import tempfile
+import time
+import uuid
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.base import Base
+from app.database import apply_sqlite_pragmas, engine_options, sqlite_pragmas
+from app.domains.study.models import ChatSession, ChatMessage
+from app.domains.study.repository import ChatRepository
+from app.settings import get_settings
+import app.domains.subject.models  # noqa: F401 (registers Subject for relationships)
+
+async def writer(Session, session_id: str, turns: int, stats: dict):
+    for n in range(turns):
+        async with Session() as db:
+            repo = ChatRepository(db)
+            try:
+                await repo.append_turn(session_id, f"Question {n}", f"Answer {n} " + "x" * 400)
+                stats["writes"] += 2
+            except OperationalError:
+                # "database is locked": the request would have failed
+                stats["errors"] += 1
+
+async def reader(Session, session_ids, stop: asyncio.Event, stats: dict):
+    i = 0
+    while not stop.is_set():
+        async with Session() as db:
+            try:
+                await ChatRepository(db).get_history(session_ids[i % len(session_ids)])
+                stats["reads"] += 1
+            except OperationalError:
+                stats["errors"] += 1
+        i += 1
+
+async def run_profile(path: str, profile: str, writers: int, turns: int, readers: int) -> dict:
+    settings = get_settings().model_copy(update={"sqlite_profile": profile})
+    url = f"sqlite:///{path}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[ChatSession.__table__, ChatMessage.__table__])
+    session_ids = [str(uuid.uuid4()) for _ in range(writers)]
+    with engine.begin() as conn:
+        conn.execute(ChatSession.__table__.insert(), [{"id": s, "user_id": "bench", "topic_id": "bench"} for s in session_ids])
+    engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", **engine_options(url, settings))
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas(settings))
+    Session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    stats = {"writes": 0, "reads": 0, "errors": 0}
+    stop = asyncio.Event()
+    reader_tasks = [asyncio.create_task(reader(Session, session_ids, stop, stats)) for _ in range(readers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(Session, s, turns, stats) for s in session_ids))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*reader_tasks)
+    await async_engine.dispose()
+
+    stats["elapsed"] = elapsed
+    return stats
+
+def main():
+    writers, turns, readers = ([int(arg) for arg in sys.argv[1:4]] + [16, 50, 4][len(sys.argv[1:4]):])
+    print(f"{writers} writers x {turns} turns, {readers} concurrent readers")
+    print(f"{'profile':<12} | {'writes/s':>10} | {'reads/s':>10} | {'errors':>7} | {'elapsed':>9}")
+    print("-" * 62)
+    results = {}
+    for profile in ("default", "production"):
+        with tempfile.TemporaryDirectory() as tmp:
+            stats = asyncio.run(run_profile(os.path.join(tmp, "bench.db"), profile, writers, turns, readers))
+        results[profile] = stats
+        print(f"{profile:<12} | {stats['writes'] / stats['elapsed']:>10.0f} | {stats['reads'] / stats['elapsed']:>10.0f} | {stats['errors']:>7} | {stats['elapsed']:>8.2f}s")
+    print("-" * 62)
+    print(f"Write throughput gain: {results['default']['elapsed'] / results['production']['elapsed']:.1f}x")
+
+if __name__ == "__main__":
+    main()
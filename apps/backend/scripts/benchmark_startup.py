@@ -0,0 +1,54 @@
+"""
+Cold-start cost of the server process: time to import main.py (what a uvicorn worker
+does before it can answer /health), with Firebase initialized lazily vs at import
+(the previous behaviour), plus a check that the study domain does not import firebase_admin.
+
+Each measurement runs in a fresh interpreter.
+
+Usage: python scripts/benchmark_startup.py [runs]   (default: 5)
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SNIPPETS = {
+    "import main (lazy Firebase)": "import main",
+    "import main + Firebase init (eager)": "import main\nfrom app.domains.auth import get_firebase_app\nget_firebase_app()",
+}
+
+def time_snippet(code: str) -> float:
+    script = f"import time\nstart = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    out = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def imported_modules(module: str) -> set:
+    script = f"import sys\nimport {module}\nprint(' '.join(sys.modules))"
+    out = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Startup benchmark ({runs} fresh interpreters each, median)")
+    print("-" * 60)
+    # Interleaved, so drift (disk cache, CPU frequency) affects both variants alike
+    samples = {label: [] for label in SNIPPETS}
+    for _ in range(runs):
+        for label, code in SNIPPETS.items():
+            samples[label].append(time_snippet(code))
+    results = {}
+    for label, times in samples.items():
+        results[label] = statistics.median(times)
+        print(f"{label:<40} {results[label] * 1000:>10.0f} ms")
+    print("-" * 60)
+    lazy, eager = results.values()
+    print(f"Saved at startup: {(eager - lazy) * 1000:.0f} ms")
+
+    for module in ("app.domains.study.service", "app.domains.study.controller", "main"):
+        loaded = "firebase_admin" in imported_modules(module)
+        print(f"import {module:<32} firebase_admin loaded: {loaded}")
+
+if __name__ == "__main__":
+    main()
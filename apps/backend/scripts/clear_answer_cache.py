@@ -0,0 +1,22 @@
+import asyncio
+import sys
+import os
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import AsyncSessionLocal
+from app.domains.study.answer_cache import chat_answer_cache
+import app.domains.subject.models  # noqa: F401 (registers Subject for relationships)
+
+async def clear(topic_id: str):
+    async with AsyncSessionLocal() as db:
+        deleted = await chat_answer_cache.invalidate_topic(db, topic_id)
+    print(f"Deleted {deleted} cached answers for topic {topic_id}.")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python clear_answer_cache.py <topic_id>")
+        sys.exit(1)
+
+    asyncio.run(clear(sys.argv[1]))
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 import os
 
@@ -6,8 +7,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
-from app.domains.study.models import Topic, TopicTranslation, ChatSession, ChatMessage, InteractionLog
+from app.domains.study.models import Topic, TopicTranslation, ChatSession, ChatMessage, InteractionLog, CachedAnswer
+from app.domains.jobs.models import GenerationJob, RUNNING
+from app.domains.jobs.repository import utcnow
 from app.domains.subject.models import Subject
+from app.domains.study.cache import invalidate_topic
+from app.domains.subject.cache import invalidate_catalog
 
 def delete_topic(topic_id: str):
     db: Session = SessionLocal()
@@ -19,6 +24,16 @@ def delete_topic(topic_id: str):
 
         print(f"Found Topic: {topic.title} ({topic.id})")
 
+        # A worker generating it would write a translation for a deleted topic
+        running = db.query(GenerationJob).filter(
+            GenerationJob.topic_id == topic_id,
+            GenerationJob.status == RUNNING,
+            GenerationJob.lease_expires_at >= utcnow()
+        ).count()
+        if running:
+            print(f"Topic has {running} generation job(s) running; try again once they finish.")
+            return
+
         # 1. Find related Sessions
         sessions = db.query(ChatSession).filter(ChatSession.topic_id == topic_id).all()
         session_ids = [s.id for s in sessions]
@@ -41,9 +56,20 @@ def delete_topic(topic_id: str):
         deleted_translations = db.query(TopicTranslation).filter(TopicTranslation.topic_id == topic_id).delete(synchronize_session=False)
         print(f"Deleted {deleted_translations} translations.")
 
-        # 6. Delete Topic
+        # 6. Delete Cached Chat Answers
+        deleted_answers = db.query(CachedAnswer).filter(CachedAnswer.topic_id == topic_id).delete(synchronize_session=False)
+        print(f"Deleted {deleted_answers} cached answers.")
+
+        # 7. Delete Generation Jobs (cancels queued ones)
+        deleted_jobs = db.query(GenerationJob).filter(GenerationJob.topic_id == topic_id).delete(synchronize_session=False)
+        print(f"Deleted {deleted_jobs} generation jobs.")
+
+        # 8. Delete Topic
         db.delete(topic)
         db.commit()
+        # Reaches running servers through REDIS_URL; without it they drop the topic after TOPIC_CACHE_TTL_SECONDS
+        asyncio.run(invalidate_topic(topic_id))
+        asyncio.run(invalidate_catalog())
         print(f"Successfully deleted topic {topic.id} and all related data.")
 
     except Exception as e:
@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import sys
 import os
 
@@ -8,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.domains.access.models import AccessCode
 from app.utils.security import hash_access_code
+from app.domains.access.cache import notify_access_codes_changed
 
 def add_code(code: str):
     db: Session = SessionLocal()
@@ -21,6 +23,7 @@ def add_code(code: str):
         new_code = AccessCode(code=hashed, is_active=True)
         db.add(new_code)
         db.commit()
+        asyncio.run(notify_access_codes_changed())
         print(f"Successfully added new access code. ID: {new_code.id}")
     except Exception as e:
         print(f"Error adding code: {e}")
@@ -48,6 +51,8 @@ def set_status(code_id: int, active: bool):
         
         code.is_active = active
         db.commit()
+        # Running servers reload their active-code set (immediately with REDIS_URL, else within ACCESS_CODE_REFRESH_SECONDS)
+        asyncio.run(notify_access_codes_changed())
         status = "Active" if active else "Disabled"
         print(f"Code ID {code_id} is now {status}.")
     except Exception as e:
@@ -87,8 +87,9 @@ def optimize():
     
     print("\nOptimization Complete!")
     # Save
-    optimized_program.save("optimized_pidgin_explainer.json")
-    print("Saved to optimized_pidgin_explainer.json")
+    # Running servers pick the new demos up on the next Pidgin request (mtime change)
+    optimized_program.save(settings.pidgin_demos_path)
+    print(f"Saved to {settings.pidgin_demos_path}")
 
 if __name__ == "__main__":
     optimize()
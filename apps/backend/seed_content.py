@@ -1,9 +1,15 @@
 import asyncio
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+import sys
+from app.database import AsyncSessionLocal
 from app.domains.study.repository import TopicRepository
 from app.domains.subject.repository import SubjectRepository
+from app.domains.subject.cache import invalidate_catalog
 from app.domains.study.models import User
+from app.domains.study.pregeneration import translation_pregenerator
+from app.domains.jobs.worker import job_worker
+import app.domains.study.jobs  # noqa: F401 (registers the generation job handlers)
+from app.config.llm import configure_llm
+from app.settings import get_settings
 
 # Sample Data matching User screenshot
 SUBJECTS_DATA = [
@@ -252,52 +258,76 @@ SUBJECTS_DATA = [
     }
 ]
 
-def seed_content():
-    db = SessionLocal()
-    try:
-        subject_repo = SubjectRepository(db)
-        topic_repo = TopicRepository(db)
-
-        for subj_data in SUBJECTS_DATA:
-            # Check if subject exists
-            subject = subject_repo.get_by_slug(subj_data['slug'])
-            if not subject:
-                subject = subject_repo.create(
-                    name=subj_data['name'], 
-                    slug=subj_data['slug'], 
-                    is_featured=subj_data['is_featured']
-                )
-                print(f"Created Subject: {subject.name}")
-            else:
-                print(f"Subject {subject.name} already exists.")
+async def seed_content():
+    async with AsyncSessionLocal() as db:
+        try:
+            subject_repo = SubjectRepository(db)
+            topic_repo = TopicRepository(db)
 
-            # Seed Topics
-            for t_data in subj_data['topics']:
-                existing_topic = topic_repo.get_by_slug_and_subject(t_data['slug'], subject.id)
-                if not existing_topic:
-                    topic = topic_repo.create(
-                        title=t_data['title'],
-                        slug=t_data['slug'],
-                        subject_id=subject.id,
-                        content=t_data['content'],
-                        description=t_data['description'],
-                        is_featured=True,
-                        is_public=True
+            for subj_data in SUBJECTS_DATA:
+                # Check if subject exists
+                subject = await subject_repo.get_by_slug(subj_data['slug'])
+                if not subject:
+                    subject = await subject_repo.create(
+                        name=subj_data['name'], 
+                        slug=subj_data['slug'], 
+                        is_featured=subj_data['is_featured']
                     )
-                    print(f"Created Topic: {topic.title}")
+                    print(f"Created Subject: {subject.name}")
                 else:
-                    print(f"Topic {t_data['title']} already exists.")
-                    # Update description if missing
-                    if not existing_topic.description:
-                        existing_topic.description = t_data['description']
-                        db.commit()
-                        print(f"Updated description for {existing_topic.title}")
+                    print(f"Subject {subject.name} already exists.")
+
+                # Seed Topics
+                for t_data in subj_data['topics']:
+                    existing_topic = await topic_repo.get_by_slug_and_subject(t_data['slug'], subject.id)
+                    if not existing_topic:
+                        topic = await topic_repo.create(
+                            title=t_data['title'],
+                            slug=t_data['slug'],
+                            subject_id=subject.id,
+                            content=t_data['content'],
+                            description=t_data['description'],
+                            is_featured=True,
+                            is_public=True
+                        )
+                        print(f"Created Topic: {topic.title}")
+                    else:
+                        print(f"Topic {t_data['title']} already exists.")
+                        # Update description if missing
+                        if not existing_topic.description:
+                            existing_topic.description = t_data['description']
+                            await db.commit()
+                            print(f"Updated description for {existing_topic.title}")
+
+            # Running servers see this through a shared cache (REDIS_URL); otherwise after SUBJECT_CACHE_TTL_SECONDS
+            await invalidate_catalog()
 
 
-    except Exception as e:
-        print(f"Error seeding: {e}")
+        except Exception as e:
+            print(f"Error seeding: {e}")
+
+async def pregenerate_featured():
+    """
+    Translate the featured topics into every PREGENERATE_LANGUAGES locale now,
+    PREGENERATE_CONCURRENCY at a time, instead of waiting for a server's sweep.
+    Translations are generation jobs, so this runs its own job worker.
+    """
+    configure_llm(get_settings())
+    job_worker.start()
+    translation_pregenerator.start(sweep=False)
+    try:
+        queued = await translation_pregenerator.sweep()
+        print(f"Generating {queued} featured topic translations...")
+        await translation_pregenerator.join()
+        print(f"Pre-generation done: {translation_pregenerator.stats()}")
     finally:
-        db.close()
+        await translation_pregenerator.stop()
+        await job_worker.stop()
+
+async def main():
+    await seed_content()
+    if "--pregenerate" in sys.argv:
+        await pregenerate_featured()
 
 if __name__ == "__main__":
-    seed_content()
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""
+Generation job worker: runs queued topic/translation jobs outside the API process.
+
+Usage: python worker.py   (set JOB_WORKER_ENABLED=false on the API to leave all jobs to workers)
+"""
+import asyncio
+import signal
+
+from app.settings import get_settings
+from app.database import dispose_engines
+from app.config.llm import configure_llm, get_llm_executor, shutdown_llm_executor, LOCALE_LANGUAGES
+from app.domains.study.programs import build_study_programs
+from app.domains.study.pregeneration import translation_pregenerator
+from app.domains.jobs.worker import job_worker
+import app.domains.study.jobs  # noqa: F401 (registers the generation job handlers)
+import app.domains.subject.models  # noqa: F401 (registers Subject for relationships)
+
+async def main():
+    settings = get_settings()
+    configure_llm(settings)
+    get_llm_executor()
+    build_study_programs(LOCALE_LANGUAGES)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    job_worker.start()
+    if settings.pregenerate_translations:
+        # Topics this worker publishes queue their other locales here
+        translation_pregenerator.start(sweep=False)
+    print(f"Job worker {job_worker.owner} started ({settings.job_worker_concurrency} slots)")
+    await stop.wait()
+
+    print("Stopping; running jobs go back to the queue")
+    await translation_pregenerator.stop()
+    await job_worker.stop()
+    shutdown_llm_executor()
+    await dispose_engines()
+
+if __name__ == "__main__":
+    asyncio.run(main())
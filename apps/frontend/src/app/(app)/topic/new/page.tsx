@@ -7,6 +7,9 @@ import { useTranslation } from "@/i18n/client";
 import { AlertCircle } from "lucide-react";
 import Explanation from "@/features/study/components/Explanation";
 
+// Times to re-attach to an in-flight generation after the stream drops
+const MAX_REATTACH = 3;
+
 export default function NewTopicPage() {
   const router = useRouter();
   const searchParams = useSearchParams();
@@ -82,54 +85,78 @@ export default function NewTopicPage() {
 
         let finalId = "";
         let finalSlug = "";
-
-        for await (const chunk of createSSEStream<any>({
-          url,
-          headers: { Authorization: `Bearer ${token}` },
-        })) {
-          if (chunk.error) {
-            throw new Error(chunk.error);
-          }
-
-          if (chunk.is_existing) {
-            // Topic exists, set data immediately then replace
-            setStreamedContent(chunk.content);
-            const source = searchParams.get("source");
-            const sourceParam = source
-              ? `&source=${encodeURIComponent(source)}`
-              : "";
-
-            router.replace(
-              `/topic/${chunk.id}/${chunk.slug}?language=${encodeURIComponent(
-                finalLanguage
-              )}${sourceParam}`
-            );
-            return;
-          }
-
-          if (chunk.id) finalId = chunk.id;
-          if (chunk.slug) finalSlug = chunk.slug;
-
-          // Update content if available (Chunk 2)
-          if (chunk.content) {
-            setStreamedContent(chunk.content);
-          }
-
-          if (chunk.is_complete) {
-            // Generation finished.
-            if (finalId && finalSlug) {
-              const source = searchParams.get("source");
-              const sourceParam = source
-                ? `&source=${encodeURIComponent(source)}`
-                : "";
-
-              router.replace(
-                `/topic/${finalId}/${finalSlug}?language=${encodeURIComponent(
-                  finalLanguage
-                )}${sourceParam}`
-              );
+        let streamUrl = url;
+        let reattempts = 0;
+
+        while (true) {
+          try {
+            for await (const chunk of createSSEStream<any>({
+              url: streamUrl,
+              headers: { Authorization: `Bearer ${token}` },
+            })) {
+              if (chunk.error) {
+                reattempts = MAX_REATTACH; // Reported by the server: don't retry
+                throw new Error(chunk.error);
+              }
+
+              if (chunk.is_existing) {
+                // Topic exists, set data immediately then replace
+                setStreamedContent(chunk.content);
+                const source = searchParams.get("source");
+                const sourceParam = source
+                  ? `&source=${encodeURIComponent(source)}`
+                  : "";
+
+                router.replace(
+                  `/topic/${chunk.id}/${chunk.slug}?language=${encodeURIComponent(
+                    finalLanguage
+                  )}${sourceParam}`
+                );
+                return;
+              }
+
+              if (chunk.id) finalId = chunk.id;
+              if (chunk.slug) finalSlug = chunk.slug;
+
+              // Append streamed explanation tokens
+              if (chunk.delta) {
+                setStreamedContent((prev) => (prev || "") + chunk.delta);
+              }
+
+              // Update content if available (Chunk 2)
+              if (chunk.content) {
+                setStreamedContent(chunk.content);
+              }
+
+              if (chunk.is_complete) {
+                // Generation finished.
+                if (finalId && finalSlug) {
+                  const source = searchParams.get("source");
+                  const sourceParam = source
+                    ? `&source=${encodeURIComponent(source)}`
+                    : "";
+
+                  router.replace(
+                    `/topic/${finalId}/${finalSlug}?language=${encodeURIComponent(
+                      finalLanguage
+                    )}${sourceParam}`
+                  );
+                }
+                return;
+              }
             }
-            return;
+            throw new Error("Connection closed before the topic was ready");
+          } catch (err) {
+            // The connection dropped mid-generation; the job keeps running on the
+            // server, so re-attach to it (it resends the explanation so far).
+            if (!finalId || reattempts >= MAX_REATTACH) throw err;
+            reattempts++;
+            setStreamedContent("");
+            streamUrl = `${
+              process.env.NEXT_PUBLIC_API_URL || ""
+            }/api/study/topics/${finalId}/stream?language=${encodeURIComponent(
+              finalLanguage
+            )}`;
           }
         }
       } catch (err: any) {
@@ -188,7 +215,7 @@ export default function NewTopicPage() {
         onBack={() => router.push("/")}
         handleLanguageSwitch={() => {}} // Disabled during generation
         isGenerating={true}
-        currentExplanation={null} // Shows loading placeholder
+        currentExplanation={streamedContent} // Loading placeholder until the first tokens arrive
         selectedTopic={topicQuery}
         language={uiLanguage} // Usage of calculated UI language
         onOpenSidebar={() => {}} // Disabled
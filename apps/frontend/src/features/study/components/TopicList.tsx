@@ -1,7 +1,9 @@
 "use client";
 import Link from "next/link";
+import { useState } from "react";
 import { ArrowRight, ChevronLeft } from "lucide-react";
 import { useTranslation } from "@/i18n/client";
+import { fetchSubjectBySlug } from "@/lib/api";
 
 // eslint-disable-next-line @typescript-eslint/no-explicit-any
 type Topic = {
@@ -17,6 +19,7 @@ type Subject = {
   title?: string;
   slug: string;
   topics?: Topic[];
+  topics_next_cursor?: string | null;
 };
 
 type TopicListProps = {
@@ -25,7 +28,23 @@ type TopicListProps = {
 
 export default function TopicList({ subject }: TopicListProps) {
   const { t } = useTranslation();
-  const topics = subject.topics || [];
+  const [topics, setTopics] = useState<Topic[]>(subject.topics || []);
+  const [nextCursor, setNextCursor] = useState(subject.topics_next_cursor);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchSubjectBySlug(subject.slug, nextCursor);
+      if (page) {
+        setTopics((prev) => [...prev, ...(page.topics || [])]);
+        setNextCursor(page.topics_next_cursor);
+      }
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
 
   return (
     <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8 min-h-[60vh]">
@@ -98,6 +117,15 @@ export default function TopicList({ subject }: TopicListProps) {
             </div>
           </div>
         )}
+        {nextCursor && (
+          <button
+            onClick={loadMore}
+            disabled={isLoadingMore}
+            className="w-full py-3 rounded-lg border border-border text-primary font-medium hover:bg-hover hover:border-primary transition-all disabled:opacity-50"
+          >
+            {isLoadingMore ? "Loading..." : "Load more topics"}
+          </button>
+        )}
       </div>
     </div>
   );
@@ -14,7 +14,7 @@ interface UseSidebarChatReturn {
   clearMessages: () => void;
 }
 
-import { startChatSession, sendChatMessage } from "@/lib/api";
+import { startChatSession, streamChatMessage } from "@/lib/api";
 
 export function useSidebarChat(
   apiUrl?: string,
@@ -64,10 +64,32 @@ export function useSidebarChat(
           throw new Error("No session ID and no Topic ID to start one.");
         }
 
-        const data = await sendChatMessage(currentSessionId, content, language);
+        // Stream the answer into a placeholder assistant message
+        setMessages((prev) => [...prev, { role: "assistant", content: "" }]);
+        const setAnswer = (update: (current: string) => string) =>
+          setMessages((prev) => {
+            const next = [...prev];
+            const last = next[next.length - 1];
+            next[next.length - 1] = { ...last, content: update(last.content) };
+            return next;
+          });
 
-        const aiMsg: Message = { role: "assistant", content: data.answer };
-        setMessages((prev) => [...prev, aiMsg]);
+        for await (const event of streamChatMessage(
+          currentSessionId,
+          content,
+          language
+        )) {
+          if (event.error) {
+            // The tutor is busy (LLM backend overloaded); nothing was saved
+            setAnswer(() => "I'm a bit busy right now. Please try again in a moment.");
+          }
+          if (event.delta) {
+            setAnswer((current) => current + event.delta);
+          }
+          if (event.is_complete && event.answer !== undefined) {
+            setAnswer(() => event.answer as string);
+          }
+        }
       } catch (error) {
         console.error("Error sending message:", error);
         // Optionally add an error message to the chat
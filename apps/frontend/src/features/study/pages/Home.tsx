@@ -165,7 +165,9 @@ export default function Home({ subjects = [] }: HomeProps) {
               href={`/subjects/${subject.slug}`}
               className="relative z-10 pt-4 border-t border-border mt-auto flex items-center justify-between text-sm font-medium text-primary cursor-pointer"
             >
-              <span>{subject.topics?.length || 0} Topics</span>
+              <span>
+                {subject.topic_count ?? subject.topics?.length ?? 0} Topics
+              </span>
               <span className="group-hover:translate-x-1 transition-transform">
                 View All &rarr;
               </span>
@@ -1,5 +1,6 @@
 import { env } from "@/env.client";
 import { auth } from "./firebase";
+import { createSSEStream } from "./sse";
 
 const API_URL = env.NEXT_PUBLIC_API_URL + "/api";
 
@@ -10,8 +11,11 @@ export async function fetchSubjects(featured: boolean = false) {
   return data.subjects;
 }
 
-export async function fetchSubjectBySlug(slug: string) {
-  const res = await fetch(`${API_URL}/subjects/${slug}`);
+export async function fetchSubjectBySlug(slug: string, topicsCursor?: string) {
+  const query = topicsCursor
+    ? `?topics_cursor=${encodeURIComponent(topicsCursor)}`
+    : "";
+  const res = await fetch(`${API_URL}/subjects/${slug}${query}`);
   if (!res.ok) return null;
   if (!res.ok) return null;
   return await res.json();
@@ -96,6 +100,35 @@ export async function sendChatMessage(
   return await res.json();
 }
 
+export interface ChatStreamEvent {
+  session_id: string;
+  is_complete: boolean;
+  delta?: string;
+  status?: string;
+  answer?: string;
+  error?: string;
+  retry_after?: number;
+}
+
+export async function* streamChatMessage(
+  sessionId: string,
+  message: string,
+  language: string
+): AsyncGenerator<ChatStreamEvent> {
+  const token = await auth.currentUser?.getIdToken();
+  if (!token) throw new Error("Authentication required");
+
+  yield* createSSEStream<ChatStreamEvent>({
+    url: `${API_URL}/study/chat/stream`,
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      Authorization: `Bearer ${token}`,
+    },
+    body: JSON.stringify({ session_id: sessionId, message, language }),
+  });
+}
+
 export async function startChatSession(
   topicId: string,
   topicName?: string,
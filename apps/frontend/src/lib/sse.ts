@@ -1,6 +1,8 @@
 export interface SSEOptions {
   url: string;
   headers?: HeadersInit;
+  method?: "GET" | "POST";
+  body?: BodyInit;
 }
 
 /**
@@ -11,6 +13,8 @@ export async function* createSSEStream<T>(
   options: SSEOptions
 ): AsyncGenerator<T> {
   const response = await fetch(options.url, {
+    method: options.method || "GET",
+    body: options.body,
     headers: {
       Accept: "text/event-stream",
       ...options.headers,